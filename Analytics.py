@@ -0,0 +1,148 @@
+from argparse import ArgumentParser
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import islice
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+import json
+import os
+import struct
+import sys
+import time
+
+from GameLog import GameLog
+from Rules import Rules
+
+
+@dataclass
+class Summary:
+    """
+    Результат повторной симуляции одной игры
+    """
+    size: int
+    score: int
+    recorded_score: int
+    level: int
+    death_height: int
+    cascades: Counter
+
+
+@dataclass
+class Stats:
+    """
+    Агрегированная статистика по всем играм
+    """
+    SCORE_BUCKET = 1000
+
+    games: int = 0
+    errors: int = 0
+    mismatches: int = 0
+    size: int = 0
+    scores: Counter = field(default_factory=Counter)
+    cascades: Counter = field(default_factory=Counter)
+    death_heights: Counter = field(default_factory=Counter)
+    levels: Counter = field(default_factory=Counter)
+
+    def add(self, summary: Optional[Summary]) -> None:
+        if summary is None:
+            self.errors += 1
+            return
+        self.games += 1
+        self.size += summary.size
+        self.mismatches += summary.score != summary.recorded_score
+        self.scores[summary.score // Stats.SCORE_BUCKET * Stats.SCORE_BUCKET] += 1
+        self.cascades.update(summary.cascades)
+        self.death_heights[summary.death_height] += 1
+        self.levels[summary.level + 1] += 1
+
+    def as_dict(self) -> dict:
+        return {
+            'games': self.games,
+            'errors': self.errors,
+            'mismatches': self.mismatches,
+            'scores': dict(sorted(self.scores.items())),
+            'cascades': dict(sorted(self.cascades.items())),
+            'death_heights': dict(sorted(self.death_heights.items())),
+            'levels': dict(sorted(self.levels.items()))
+        }
+
+
+def simulate(path: Path) -> Optional[Summary]:
+    """
+    Повторная симуляция игры по правилам Rules
+
+    :param path: Файл игры
+    :return: Результат симуляции или None, если файл не удалось прочитать
+    """
+    # Поврежденный или недописанный файл учитывается как ошибка и не прерывает обработку остальных
+    try:
+        data = path.read_bytes()
+        game = GameLog.decode(data)
+
+        rules = Rules()
+        cascades = Counter()
+        for move in game.moves:
+            rules.freeze(move)
+            rules.score += rules.level_points(move.level)
+            if bonus_list := rules.settle():
+                cascades[len(bonus_list)] += 1
+    except (OSError, ValueError, IndexError, struct.error):
+        return None
+
+    height = next((Rules.ROWS - y for y in range(Rules.ROWS)
+                   if any(rules.grid[x, y] for x in range(Rules.COLS))), 0)
+    return Summary(len(data), rules.score, game.score, game.level, height, cascades)
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def analyse(path: Path, workers: int, chunk: int) -> Stats:
+    """
+    Потоковая обработка каталога игр пулом процессов
+
+    Файлы передаются в пул порциями, поэтому в памяти одновременно находятся только обрабатываемые игры.
+
+    :param path: Каталог с играми
+    :param workers: Количество процессов
+    :param chunk: Количество файлов в одном задании процесса
+    :return: Агрегированная статистика
+    """
+    stats = Stats()
+    start = last = time.monotonic()
+    with Pool(workers) as pool:
+        for batch in batched(GameLog.files(path), workers * chunk * 4):
+            for summary in pool.imap_unordered(simulate, batch, chunksize=chunk):
+                stats.add(summary)
+                if (now := time.monotonic()) - last > 1:
+                    last = now
+                    progress(stats, now - start)
+    progress(stats, time.monotonic() - start)
+    print(file=sys.stderr)
+    return stats
+
+
+def progress(stats: Stats, elapsed: float) -> None:
+    elapsed = max(elapsed, 1e-9)
+    print(f"\r{stats.games + stats.errors} games, {(stats.games + stats.errors) / elapsed:.0f} games/s, "
+          f"{stats.size / elapsed / 2 ** 20:.1f} MB/s, {stats.errors} errors, {stats.mismatches} mismatches",
+          end='', file=sys.stderr)
+
+
+def main():
+    parser = ArgumentParser(description='Статистика по записанным играм TETCOLOR')
+    parser.add_argument('path', type=Path, help='Каталог с записанными играми')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help='Количество процессов')
+    parser.add_argument('-c', '--chunk', type=int, default=64, help='Количество файлов в одном задании')
+    args = parser.parse_args()
+
+    stats = analyse(args.path, args.workers, args.chunk)
+    print(json.dumps(stats.as_dict(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+from pygame import mixer, time
+from pygame.mixer import Sound, Channel
+
+from pathlib import PurePath
+from dataclasses import dataclass, field
+from typing import Hashable
+
+
+@dataclass
+class Effect:
+    sound: Sound
+    voices: int
+    interval: int
+    last_time: int = -1
+    channels: list[int] = field(default_factory=list)
+
+
+class Audio:
+    """
+    Звуковая подсистема с фиксированным пулом голосов
+
+    Звуки проигрываются только на зарезервированных каналах микшера. Для каждого эффекта ограничено
+    количество одновременно звучащих голосов и минимальный интервал между запусками, а количество
+    запусков за один кадр ограничено MAX_PER_FRAME независимо от частоты ввода.
+
+    :param voices: Размер пула голосов (количество зарезервированных каналов)
+    """
+
+    VOICES = 4
+    MAX_PER_FRAME = 2
+
+    # Декодированные звуки, общие для всех экземпляров: {Путь к файлу -> Звук}
+    _cache: dict[PurePath, Sound] = {}
+
+    def __init__(self, voices: int = VOICES) -> None:
+        self.enabled = mixer.get_init() is not None
+        self.effects: dict[Hashable, Effect] = {}
+        self.channels: list[Channel] = []
+        self.budget = Audio.MAX_PER_FRAME
+        if self.enabled:
+            if mixer.get_num_channels() < voices:
+                mixer.set_num_channels(voices)
+            mixer.set_reserved(voices)
+            self.channels = [Channel(i) for i in range(voices)]
+
+    def load(self, key: Hashable, path: PurePath, voices: int = 1, interval: int = 0) -> None:
+        """
+        Регистрирует звуковой эффект. Файл декодируется только при первой загрузке
+
+        :param key: Ключ эффекта
+        :param path: Путь к файлу
+        :param voices: Максимальное количество одновременно звучащих голосов эффекта
+        :param interval: Минимальный интервал между запусками эффекта, мс
+        """
+        if not self.enabled or key in self.effects:
+            return
+        if (sound := Audio._cache.get(path)) is None:
+            sound = Audio._cache[path] = Sound(path)
+        self.effects[key] = Effect(sound, max(1, min(voices, len(self.channels))), interval)
+
+    def play(self, key: Hashable) -> None:
+        """
+        Проигрывает эффект, если это позволяют ограничения пула
+
+        :param key: Ключ эффекта
+        """
+        if self.budget <= 0 or (effect := self.effects.get(key)) is None:
+            return
+        now = time.get_ticks()
+        if effect.last_time >= 0 and now - effect.last_time < effect.interval:
+            return
+
+        # Голоса эффекта, которые еще звучат
+        effect.channels = [i for i in effect.channels
+                           if self.channels[i].get_busy() and self.channels[i].get_sound() is effect.sound]
+        if len(effect.channels) >= effect.voices:
+            # Перезапуск самого старого голоса эффекта
+            index = effect.channels.pop(0)
+        else:
+            index = next((i for i, channel in enumerate(self.channels) if not channel.get_busy()), None)
+            if index is None:
+                return
+
+        self.channels[index].play(effect.sound)
+        effect.channels.append(index)
+        effect.last_time = now
+        self.budget -= 1
+
+    def update(self) -> None:
+        """
+        Восстанавливает лимит запусков. Вызывается один раз за кадр
+        """
+        self.budget = Audio.MAX_PER_FRAME
@@ -1,20 +1,26 @@
 from pygame import draw, Surface
 from pygame.font import Font
-from pygame.mixer import Sound
 from pygame.event import Event, post
 import pygame.constants
 
 from copy import copy
-from random import randint
-from datetime import datetime
+from random import Random
+import random
+import struct
 from typing import Self, Optional
 from enum import IntEnum, Enum
-from itertools import groupby
-from collections import defaultdict
 
 from System import resource_path
 from DrawObject import BaseDrawObject, DrawObject
+from Rules import Rules
 from HighScore import HighScore
+from Audio import Audio
+from Telemetry import Telemetry
+from GameLog import GameLog
+from Clock import Clock
+from Replay import Recorder
+from SharedState import SharedState
+from SaveGame import SaveGame
 from Colors import NONE, BLACK, RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW, GRAY
 
 FONT_M = resource_path(r'fonts/pt-mono.ttf')
@@ -33,6 +39,36 @@ class KEY(IntEnum):
     SOUND_FX = pygame.K_s
 
 
+# Клавиши игроков для игры на нескольких полях: влево, вправо, вниз, поворот по и против часовой стрелки, сброс,
+# пауза, выход
+PLAYER_KEYS = (
+    (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_DOWN, pygame.K_UP, pygame.K_RSHIFT, pygame.K_RCTRL,
+     pygame.K_p, pygame.K_DELETE),
+    (pygame.K_a, pygame.K_d, pygame.K_x, pygame.K_w, pygame.K_q, pygame.K_LSHIFT, pygame.K_e, pygame.K_TAB),
+    (pygame.K_f, pygame.K_h, pygame.K_g, pygame.K_t, pygame.K_r, pygame.K_v, pygame.K_y, pygame.K_b),
+    (pygame.K_j, pygame.K_l, pygame.K_k, pygame.K_i, pygame.K_u, pygame.K_m, pygame.K_o, pygame.K_n),
+    (pygame.K_KP4, pygame.K_KP6, pygame.K_KP5, pygame.K_KP8, pygame.K_KP7, pygame.K_KP0,
+     pygame.K_KP9, pygame.K_KP_MINUS),
+    (pygame.K_F1, pygame.K_F2, pygame.K_F3, pygame.K_F4, pygame.K_F5, pygame.K_F6, pygame.K_F7, pygame.K_F8),
+    (pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5, pygame.K_6, pygame.K_F9, pygame.K_F10),
+    (pygame.K_7, pygame.K_8, pygame.K_9, pygame.K_0, pygame.K_MINUS, pygame.K_EQUALS, pygame.K_F11, pygame.K_F12)
+)
+
+
+def player_keys(player: Optional[int] = None) -> dict[int, KEY]:
+    """
+    Назначение клавиш игрока
+
+    :param player: Номер игрока. Если не задан, то используются клавиши KEY
+    :return: Словарь вида {Клавиша: int -> Действие: KEY}
+    """
+    if player is None:
+        return {e.value: e for e in KEY}
+    actions = (KEY.LEFT, KEY.RIGHT, KEY.DOWN, KEY.ROTATE_RIGHT, KEY.ROTATE_LEFT, KEY.HARD_DROP, KEY.PAUSE, KEY.QUIT)
+    common = (KEY.PLAY, KEY.SOUND_FX)
+    return {e.value: e for e in common} | dict(zip(PLAYER_KEYS[player], actions))
+
+
 class Piece(BaseDrawObject):
     """
     Фигура
@@ -41,6 +77,8 @@ class Piece(BaseDrawObject):
     :param ctx: Контекст для рисования
     :param p: Позиция
     :param type_id: Тип
+    :param rng: Генератор случайных чисел для типа и цветов
+    :param shape: Готовая фигура с цветами. Если не задана, то цвета выбираются случайно
     """
 
     class ROTATION(Enum):
@@ -76,11 +114,13 @@ class Piece(BaseDrawObject):
         KEY.ROTATE_LEFT: lambda p: p.rotate(Piece.ROTATION.LEFT)
     }
 
-    def __init__(self, ctx, p: tuple[int, int] = (0, 0), type_id: int = 0):
+    def __init__(self, ctx, p: tuple[int, int] = (0, 0), type_id: int = 0, rng: Random = random,
+                 shape: Optional[list[list[int]]] = None):
         super().__init__(ctx)
-        self.typeId = type_id if type_id != 0 else self.randomize_piece_type(len(Piece.SHAPES) - 1)
-        self.shape = [list(self.randomize_piece_type(len(Piece.COLORS) - 1) if c != 0 else 0 for c in e)
-                      for e in Piece.SHAPES[self.typeId]]
+        self.typeId = type_id if type_id != 0 else self.randomize_piece_type(len(Piece.SHAPES) - 1, rng)
+        self.shape = shape if shape else \
+            [list(self.randomize_piece_type(len(Piece.COLORS) - 1, rng) if c != 0 else 0 for c in e)
+             for e in Piece.SHAPES[self.typeId]]
         self.x, self.y = p
         self.hard_dropped = False
 
@@ -125,14 +165,15 @@ class Piece(BaseDrawObject):
         self.x = 2 if self.typeId < 3 else 3
 
     @staticmethod
-    def randomize_piece_type(no_of_types: int) -> int:
+    def randomize_piece_type(no_of_types: int, rng: Random = random) -> int:
         """
         Получает случайный тип тетрамино
 
         :param no_of_types: Количесво типов
+        :param rng: Генератор случайных чисел
         :return: Тип
         """
-        return randint(0, no_of_types - 1) + 1
+        return rng.randint(0, no_of_types - 1) + 1
 
     def offset(self, x: int, y: int) -> Self:
         """
@@ -169,7 +210,7 @@ class Piece(BaseDrawObject):
         return p
 
 
-class Board(DrawObject):
+class Board(DrawObject, Rules):
     """
     Игровое поле
 
@@ -177,18 +218,20 @@ class Board(DrawObject):
     :param left_top: Позиция левого верхнего угла объкта
     :param ctx_next: Контекст для вывода следующей фигуры
     :param high_score: Ссылка на объект HighScore
+    :param audio: Звуковая подсистема. Если не задана, то звук не воспроизводится
+    :param telemetry: Сбор статистики игры. Если не задан, то статистика не собирается
+    :param game_log: Запись сыгранных игр. Если не задана, то игры не записываются
+    :param keys: Назначение клавиш. Если не задано, то используются клавиши KEY
+    :param clock: Часы игры. Если не заданы, то создаются собственные
+    :param replay: Запись повтора игры. Если не задана, то повтор не записывается
+    :param shared: Общая память для внешних процессов. Если не задана, то состояние не публикуется
+    :param save_game: Сохранение незаконченной игры. Если не задано, то игра не сохраняется
+    :param close: Выход из законченной или не начатой игры закрывает окно. В игре на нескольких полях выход
+    только завершает игру поля, а окно закрывает Scheduler
     """
-    COLS = 7
-    ROWS = 18
     BLOCK_SIZE = 50
     BORDER_WIDTH = 2
 
-    POINTS = (
-        {3: 40, 4: 120, 5: 440, 6: 1560, 7: 5560},
-        {3: 50, 4: 150, 5: 550, 6: 1950, 7: 6950},
-        {3: 75, 4: 225, 5: 825, 6: 2925, 7: 10425}
-    )
-
     # LEVEL = (800, 720, 630, 550, 470, 380, 300, 220, 130, 100, 80, 80, 80, 70, 70, 70, 50, 50, 50, 30, 30)
     LEVEL = (800, 730, 660, 590, 530, 470, 410, 360, 310, 260, 220, 180, 140, 110, 100, 90, 90, 90, 90, 80, 80)
 
@@ -198,31 +241,57 @@ class Board(DrawObject):
         MOVES = 'moves'
         POINTS = 'points'
 
-    MAX_OPACITY = 15
-    TIME_PER_LEVEL = 59
-
-    class Field:
-        def __init__(self, color: int = 0):
-            self.color = color
-            self.selected = False
+    # Ограничения эффектов: {Звук -> (Количество голосов, Минимальный интервал между запусками, мс)}
+    SOUND_LIMITS = {
+        SOUNDS.DROP: (1, 100),
+        SOUNDS.FINISH: (1, 0),
+        SOUNDS.MOVES: (1, 60),
+        SOUNDS.POINTS: (2, 100)
+    }
 
-        def __bool__(self):
-            return self.selected
+    # Время падения фигуры на одну клетку для каждого уровня, тики
+    LEVEL_TICKS = tuple(Clock.ms(e) for e in LEVEL)
+    SECOND_TICKS = Clock.ms(1000)
 
-        def __repr__(self):
-            return f"{'-' if self.selected else ''}{self.color}"
+    MAX_OPACITY = 15
+    TIME_PER_LEVEL = 59
 
-    def __init__(self, ctx, left_top, ctx_next: Surface, high_score: HighScore):
+    # Снимок состояния: поле (цвета, отметки), фигура и следующая фигура (тип, x, y, сброшена, строк, колонок,
+    # цвета), прозрачность, пауза, конец игры, ускоренное падение, звук, счет, уровень, тики от падения и от начала
+    # уровня, секунды и тики уровня, бонус, удаления подряд (количество, типы), состояние генератора случайных чисел.
+    # Время хранится относительно часов: поля в режиме нескольких игроков делят одни часы
+    MAX_BONUS_LIST = 64
+    PIECE_FORMAT = 'BbbBBB9s'
+    SNAPSHOT = struct.Struct(f'<{Rules.COLS * Rules.ROWS}s{Rules.COLS * Rules.ROWS}s{PIECE_FORMAT}{PIECE_FORMAT}'
+                             f'bBBBBIHqqHIIB{MAX_BONUS_LIST}s625I')
+
+    def __init__(self, ctx, left_top, ctx_next: Surface, high_score: HighScore, audio: Optional[Audio] = None,
+                 telemetry: Optional[Telemetry] = None, game_log: Optional[GameLog] = None,
+                 keys: Optional[dict[int, KEY]] = None, clock: Optional[Clock] = None,
+                 replay: Optional[Recorder] = None, shared: Optional[SharedState] = None,
+                 save_game: Optional[SaveGame] = None, close: bool = True):
         super().__init__(ctx, left_top)
+        self.clock = clock if clock else Clock()
+        self.close = close
+        self.replay = replay
+        self.shared = shared
+        self.save_game = save_game
+        self.random = Random()
+        self.keys = keys if keys else player_keys()
         self.font = Font(FONT_M, 24)
+        self.telemetry = telemetry
+        self.game_log = game_log
 
-        self.music = {e: Sound(resource_path(f"sounds/{e.value}.mp3")) for e in Board.SOUNDS}
+        self.audio = audio
+        if self.audio:
+            for e in Board.SOUNDS:
+                self.audio.load(e, resource_path(f"sounds/{e.value}.mp3"), *Board.SOUND_LIMITS[e])
 
         self.play_sound_fx = False
 
         self.ctx_next = ctx_next
         self.high_score = high_score
-        self.grid: list[list[Board.Field]] = []
+        self.grid = Rules.Grid()
         self.piece = None
         self.next = None
 
@@ -233,13 +302,17 @@ class Board(DrawObject):
         self.level = 0
         self.score = 0
 
-        self.now = datetime.now()
+        self.now = self.clock.ticks
         self.hard_drop = False
 
-        self.level_time = datetime.now()
+        self.level_time = self.clock.ticks
         self.level_cnt = 0
+        # Тики уровня без пауз для статистики
+        self.level_ticks = 0
 
         self.bonus_list = []
+        # Бонус за удаления подряд хранится, пока его не заберет для показа Score: за кадр может пройти
+        # несколько тиков
         self.bonus = 0
 
         self.reset()
@@ -252,8 +325,8 @@ class Board(DrawObject):
 
         :param sound: Тип звука
         """
-        if self.play_sound_fx:
-            self.music[sound].play()
+        if self.play_sound_fx and self.audio:
+            self.audio.play(sound)
 
     @property
     def pause(self):
@@ -261,7 +334,10 @@ class Board(DrawObject):
 
     @pause.setter
     def pause(self, value):
+        paused = value and not self._pause
         self._pause = value
+        if paused and self.save_game:
+            self.save_game.save(self)
         if not self._pause and self.game_over is None:
             self._game_over = False
 
@@ -274,12 +350,19 @@ class Board(DrawObject):
         if value:
             if not self._game_over:
                 self.play(Board.SOUNDS.FINISH)
-                self.high_score.add_score(self.score)
+                if self.game_log:
+                    self.game_log.finish(self.score, self.level)
+                if self.replay:
+                    self.replay.finish(self)
+                if self.save_game:
+                    self.save_game.clear()
+                if self.high_score:
+                    self.high_score.add_score(self.score)
         self._game_over = value
 
     def reset(self) -> None:
         self.grid = self.get_empty_grid()
-        self.piece = Piece(self.ctx)
+        self.piece = Piece(self.ctx, rng=self.random)
         self.piece.set_starting_position()
         self.get_new_piece()
 
@@ -290,14 +373,82 @@ class Board(DrawObject):
         self.level = 0
         self.score = 0
 
-        self.now = datetime.now()
+        self.now = self.clock.ticks
         self.hard_drop = False
 
-        self.level_time = datetime.now()
+        self.level_time = self.clock.ticks
         self.level_cnt = 0
+        self.level_ticks = 0
+
+        self.bonus = 0
+
+    def record(self, resumed: bool = False) -> None:
+        """
+        Начало записи игры: статистика, ходы и повтор. Вызывается при начале новой игры и при продолжении
+        сохраненной
+
+        :param resumed: Продолжение сохраненной игры. Игра не считается в статистике новой
+        """
+        if self.telemetry:
+            if resumed:
+                self.telemetry.resume()
+            else:
+                self.telemetry.game()
+        if self.game_log:
+            self.game_log.start()
+        if self.replay:
+            self.replay.start()
+
+    def snapshot(self) -> bytes:
+        """
+        Снимок полного состояния игры
+
+        :return: Байты длиной SNAPSHOT.size
+        """
+        def piece(p: Piece) -> tuple:
+            return (p.typeId, p.x, p.y, p.hard_dropped, len(p.shape), len(p.shape[0]),
+                    bytes(value for row in p.shape for value in row))
+
+        game_over = 2 if self._game_over is None else int(self._game_over)
+        bonus_list = self.bonus_list[-Board.MAX_BONUS_LIST:]
+        return Board.SNAPSHOT.pack(self.colors(), self.selection(), *piece(self.piece), *piece(self.next),
+                                   self.opacity, self._pause, game_over, self.hard_drop, self.play_sound_fx,
+                                   self.score, self.level, self.clock.ticks - self.now,
+                                   self.clock.ticks - self.level_time, self.level_cnt, self.level_ticks, self.bonus,
+                                   len(bonus_list), bytes(bonus_list),
+                                   *self.random.getstate()[1])
+
+    def restore(self, data: bytes) -> None:
+        """
+        Восстановление состояния игры из снимка
+
+        :param data: Снимок, как возвращает snapshot
+        """
+        values = Board.SNAPSHOT.unpack_from(data)
+        colors, selected = values[:2]
+
+        def piece(ctx: Surface, offset: int) -> Piece:
+            type_id, x, y, hard_dropped, rows, cols, shape = values[offset:offset + 7]
+            p = Piece(ctx, (x, y), type_id, shape=[list(shape[i * cols:(i + 1) * cols]) for i in range(rows)])
+            p.hard_dropped = bool(hard_dropped)
+            return p
+
+        self.grid = Rules.Grid(colors, selected)
+        self.piece = piece(self.ctx, 2)
+        self.next = piece(self.ctx_next, 9)
+        (self.opacity, pause, game_over, hard_drop, play_sound_fx, self.score, self.level, now, level_time,
+         self.level_cnt, self.level_ticks, self.bonus, bonus_cnt, bonus_list) = values[16:30]
+        self.now = self.clock.ticks - now
+        self.level_time = self.clock.ticks - level_time
+        self._pause = bool(pause)
+        self._game_over = None if game_over == 2 else bool(game_over)
+        self.hard_drop = bool(hard_drop)
+        self.play_sound_fx = bool(play_sound_fx)
+        self.bonus_list = list(bonus_list[:bonus_cnt])
+        self.random.setstate((3, tuple(values[30:]), None))
 
     def get_new_piece(self) -> None:
-        self.next = Piece(self.ctx_next)
+        self.next = Piece(self.ctx_next, rng=self.random)
 
     def draw(self) -> None:
         self.ctx.fill(GRAY)
@@ -310,17 +461,23 @@ class Board(DrawObject):
         def opacity(color):
             return [e - e * (Board.MAX_OPACITY - self.opacity + 1) // Board.MAX_OPACITY for e in color]
 
-        for x, col in enumerate(self.grid):
-            for y, value in enumerate(col):
-                if value.color > 0:
-                    rect = (x * Board.BLOCK_SIZE, y * Board.BLOCK_SIZE,
-                            Board.BLOCK_SIZE + Board.BORDER_WIDTH, Board.BLOCK_SIZE + Board.BORDER_WIDTH)
-                    color = opacity(Piece.COLORS[value.color]) \
-                        if self.opacity and value.selected else Piece.COLORS[value.color]
-                    draw.rect(self.ctx, color, rect)
-                    draw.rect(self.ctx, BLACK, rect, width=Board.BORDER_WIDTH)
+        colors, selected = self.grid.colors, self.grid.selected
+        for i, value in enumerate(colors):
+            if value > 0:
+                x, y = divmod(i, Board.ROWS)
+                rect = (x * Board.BLOCK_SIZE, y * Board.BLOCK_SIZE,
+                        Board.BLOCK_SIZE + Board.BORDER_WIDTH, Board.BLOCK_SIZE + Board.BORDER_WIDTH)
+                color = opacity(Piece.COLORS[value]) if self.opacity and selected[i] else Piece.COLORS[value]
+                draw.rect(self.ctx, color, rect)
+                draw.rect(self.ctx, BLACK, rect, width=Board.BORDER_WIDTH)
 
     def drop(self) -> None:
+        if self.replay:
+            self.replay.tick(self)
+        if self.save_game:
+            self.save_game.autosave(self)
+        if not self.pause and not self.game_over:
+            self.level_ticks += 1
         if self.opacity != 0:
             if self.opacity < 0:
                 self.opacity = 0
@@ -334,8 +491,10 @@ class Board(DrawObject):
                     self.bonus_list.append(bonus_type)
                 else:
                     if self.bonus_list:
+                        if self.telemetry:
+                            self.telemetry.cascade(len(self.bonus_list))
                         if len(self.bonus_list) > 1:
-                            self.bonus = 500 + 1000 * (len(self.bonus_list) - 2) + (500 if 2 in self.bonus_list else 0)
+                            self.bonus = self.cascade_bonus(self.bonus_list)
                             self.score += self.bonus
                         self.bonus_list.clear()
                     if self.piece.y == 0:
@@ -345,57 +504,39 @@ class Board(DrawObject):
                         self.piece.ctx = self.ctx
                         self.piece.set_starting_position()
                         self.get_new_piece()
-                self.now = datetime.now()
+                self.now = self.clock.ticks
         else:
-            self.bonus = 0
             if not self.pause and not self.game_over:
-                d = (datetime.now() - self.level_time)
-                if d.seconds > 0:
-                    self.level_time = datetime.now()
+                if self.clock.ticks - self.level_time >= Board.SECOND_TICKS:
+                    self.level_time = self.clock.ticks
                     self.level_cnt += 1
                     if self.level_cnt > Board.TIME_PER_LEVEL:
                         self.level_cnt = 0
+                        if self.telemetry:
+                            self.telemetry.level(self.level, self.level_ticks * Clock.TICK / 1000)
+                        self.level_ticks = 0
                         self.level += 1
                 if self.hard_drop:
                     self.hard_drop = False
                 else:
-                    d = (datetime.now() - self.now)
-                    if not (d.seconds > 1 or d.microseconds > Board.LEVEL[self.level] * 1000):
+                    level = min(self.level, len(Board.LEVEL_TICKS) - 1)
+                    if self.clock.ticks - self.now <= Board.LEVEL_TICKS[level]:
                         return
                 p = self.piece.moves(KEY.DOWN)
                 if self.valid(p):
                     self.piece = p
-                    self.now = datetime.now()
+                    self.now = self.clock.ticks
                 else:
-                    self.freeze()
-                    if self.level > 5:
-                        self.score += self.level - 5
+                    if self.game_log:
+                        self.game_log.move(self.level, self.piece)
+                    self.freeze(self.piece)
+                    self.score += self.level_points(self.level)
                     if bonus_type := self.select_grid():
                         self.opacity = Board.MAX_OPACITY
                         self.bonus_list.append(bonus_type)
                     else:
                         self.opacity = -1
 
-    def clear_lines(self) -> None:
-        for col in self.grid:
-            if any(col):
-                last_empty = 0
-                for y, value in enumerate(col):
-                    if value.selected:
-                        col.pop(y)
-                        col.insert(last_empty, Board.Field())
-                    elif value.color == 0:
-                        last_empty = y
-
-    def valid(self, piece: Piece) -> bool:
-        for dy, row in enumerate(piece.shape):
-            for dx, value in enumerate(row):
-                x = piece.x + dx
-                y = piece.y + dy
-                if not (value == 0 or (self.is_inside_walls(x, y) and self.not_occupied(x, y))):
-                    return False
-        return True
-
     def move(self, key: KEY) -> None:
         if not self.pause and not self.game_over:
             p = self.piece.moves(key)
@@ -404,6 +545,8 @@ class Board(DrawObject):
                     # Hard drop
                     self.hard_drop = True
                     self.play(Board.SOUNDS.DROP)
+                    if self.telemetry and not self.piece.hard_dropped:
+                        self.telemetry.hard_drop()
                     while self.valid(p):
                         self.piece.move(p)
                         p = self.piece.moves(key)
@@ -412,138 +555,42 @@ class Board(DrawObject):
                     self.play(Board.SOUNDS.MOVES)
                     self.piece.move(p)
 
-    def select_grid(self) -> int:
-        """
-        Отметка в матрице групп элементов с длиной более 3
-
-        :return: Тип бонуса:
-        0, если групп нет; 1, если есть только одна группа длиной 3; 2 в остальных случаях
-        """
-        def diagonals_left() -> list[list[Board.Field]]:
-            """
-            Преобразует матрицу в диагональную с направлением лево-верх - право-низ
-
-            - rows - количество строк
-            - cols - количество колонок
-            - offset - отступ
-            - matrix - исходная матрица
-
-            :return: Преобразованная матрица
-            """
-            rows = Board.COLS
-            cols = Board.ROWS
-            offset = 2
-            matrix = self.grid
-            result = [[] for i in range(rows + cols - 1 - offset * 2)]
-            k = rows - 1 - offset
-            for i in range(-k, cols - offset):
-                for j in range(rows):
-                    row, col = j, i + j
-                    if 0 <= row < rows and 0 <= col < cols:
-                        result[i + k].append(matrix[row][col])
-            return result
-
-        def diagonals_right() -> list[list[Board.Field]]:
-            """
-            Преобразует матрицу в диагональную с направлением право-верх - лево-низ
-
-            - rows - количество строк
-            - cols - количество колонок
-            - offset - отступ
-            - matrix - исходная матрица
-
-            :return: Преобразованная матрица
-            """
-            rows = Board.COLS
-            cols = Board.ROWS
-            offset = 2
-            matrix = self.grid
-            result = [[] for i in range(rows + cols - 1 - offset * 2)]
-            for i in range(offset, cols + rows - 1 - offset):
-                for j in range(rows):
-                    row, col = j, i - j
-                    if 0 <= row < rows and 0 <= col < cols:
-                        result[i - offset].insert(0, matrix[row][col])
-            return result
-
-        def transpose() -> list[list[Board.Field]]:
-            """
-            Транспонирование матрицы
-
-            :return: Преобразованная матрица
-            """
-            return [list(e) for e in zip(*self.grid)]
-
-        def check_grid(grid: list[list[Board.Field]], result: dict = None) -> dict:
-            """
-            Проверки на наличие групп одинаковых элеменов длиной более 3
-
-            :param grid: Матрица для поиска
-            :param result: Результирающий словарь для дополнения. Если не задан, то создается новый
-            :return: Словарь вида {Длина: int -> Количество: int}
-            """
-            if result is None:
-                result = defaultdict(int)
-            for vector in grid:
-                for key, value in groupby(vector, key=lambda x: x.color):
-                    if key != 0:
-                        if (line_len := len(value_list := tuple(value))) > 2:
-                            result[line_len] += 1
-                            for v in value_list:
-                                v.selected = True
-            return result
-
-        lines_cnt = (
-            check_grid(self.grid),
-            check_grid(transpose()),
-            check_grid(diagonals_right(), check_grid(diagonals_left()))
-        )
-
-        bonus_type = 0
-        if any(lines_cnt):
-            for direction, line_cnt in enumerate(lines_cnt):
-                for line_len, cnt in line_cnt.items():
-                    self.score += Board.POINTS[direction][line_len] * cnt
-                    bonus_type = 2 if bonus_type > 0 or line_len > 3 else 1
-        return bonus_type
-
-    def freeze(self) -> None:
-        for y, row in enumerate(self.piece.shape):
-            for x, value in enumerate(row):
-                if value > 0:
-                    self.grid[x + self.piece.x][y + self.piece.y] = Board.Field(value)
-
-    @staticmethod
-    def get_empty_grid() -> list[list[Field]]:
-        return [[Board.Field() for _ in range(Board.ROWS)] for _ in range(Board.COLS)]
-
-    @staticmethod
-    def is_inside_walls(x: int, y: int) -> bool:
-        return 0 <= x < Board.COLS and y < Board.ROWS
-
-    def not_occupied(self, x: int, y: int) -> bool:
-        return self.grid[x][y].color == 0
-
     def update(self, events: list[Event]):
         for event in events:
             match event.type:
-                case pygame.KEYDOWN:
-                    match event.key:
-                        case KEY.QUIT:
-                            if self.game_over or self.game_over is None:
-                                post(Event(pygame.QUIT))
-                            else:
-                                self.game_over = True
-                        case KEY.PLAY:
-                            if self.game_over:
-                                self.reset()
-                                self.pause = False
-                            elif self.game_over is None:
-                                self.pause = False
-                        case KEY.PAUSE:
-                            if not (self.game_over is None or self.game_over):
-                                self.pause = not self.pause
-                        case KEY.SOUND_FX:
-                            self.play_sound_fx = not self.play_sound_fx
-                        case _:
-                            self.move(event.key)
+                case pygame.KEYDOWN if event.key in self.keys:
+                    self.action(self.keys[event.key])
+        if self.shared:
+            actions = set(self.keys.values())
+            for key in self.shared.actions():
+                if key in actions:
+                    self.action(KEY(key))
+            self.shared.publish(self)
+
+    def action(self, key: KEY) -> None:
+        """
+        Выполняет действие игрока
+
+        :param key: Действие
+        """
+        if self.replay:
+            self.replay.action(self.clock.ticks, key)
+        match key:
+            case KEY.QUIT:
+                if not (self.game_over or self.game_over is None):
+                    self.game_over = True
+                elif self.close:
+                    post(Event(pygame.QUIT))
+            case KEY.PLAY:
+                if self.game_over or self.game_over is None:
+                    if self.game_over:
+                        self.reset()
+                    self.pause = False
+                    self.record()
+            case KEY.PAUSE:
+                if not (self.game_over is None or self.game_over):
+                    self.pause = not self.pause
+            case KEY.SOUND_FX:
+                self.play_sound_fx = not self.play_sound_fx
+            case _:
+                self.move(key)
@@ -0,0 +1,57 @@
+from typing import Callable, Optional
+import time
+
+
+class Clock:
+    """
+    Виртуальные часы игры
+
+    Время игры измеряется в тиках длительностью TICK мс. Часы не идут сами: тик выполняется методом tick,
+    а метод pending сообщает, сколько тиков прошло по реальному времени с учетом множителя ускорения.
+    Для тестов и симуляции достаточно вызывать tick без pending.
+
+    :param warp: Множитель ускорения времени
+    :param source: Источник реального времени, с
+    """
+
+    TICK = 10
+    MAX_PENDING = 10
+
+    def __init__(self, warp: float = 1.0, source: Callable[[], float] = time.perf_counter) -> None:
+        self.ticks = 0
+        self.warp = warp
+        self.source = source
+        self.last: Optional[float] = None
+        self.rest = 0.0
+
+    @staticmethod
+    def ms(ms: int) -> int:
+        """
+        Преобразование миллисекунд в тики
+
+        :param ms: Время, мс
+        :return: Количество тиков
+        """
+        return ms // Clock.TICK
+
+    def tick(self) -> None:
+        """
+        Продвигает часы на один тик
+        """
+        self.ticks += 1
+
+    def pending(self) -> int:
+        """
+        Количество тиков, прошедших по реальному времени с предыдущего вызова. Количество ограничено,
+        чтобы после остановки программы (например, при вводе имени) игра не догоняла пропущенное время
+
+        :return: Количество тиков
+        """
+        now = self.source()
+        if self.last is None:
+            self.last = now
+        self.rest += (now - self.last) * 1000 * self.warp / Clock.TICK
+        self.last = now
+        ticks = int(self.rest)
+        self.rest -= ticks
+        return min(ticks, int(Clock.MAX_PENDING * max(self.warp, 1)))
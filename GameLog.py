@@ -0,0 +1,140 @@
+from pathlib import Path
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterator
+import struct
+import os
+
+from System import prune
+
+
+@dataclass
+class Move:
+    level: int
+    x: int
+    y: int
+    shape: list[list[int]]
+
+
+@dataclass
+class Game:
+    score: int = 0
+    level: int = 0
+    moves: list[Move] = field(default_factory=list)
+
+
+class GameLog:
+    """
+    Запись сыгранных игр: последовательность установленных фигур и итоговый счет
+
+    Формат файла:
+
+    - заголовок: сигнатура, счет, уровень, количество ходов
+    - ходы: уровень, x, y, количество строк и колонок фигуры, цвета блоков фигуры по строкам
+
+    Имя файла - дата и время окончания игры и имя записи, например номер поля. В каталоге остается не больше
+    keep последних игр.
+
+    :param path: Каталог для записи игр
+    :param name: Имя записи в именах файлов. Поля в игре на нескольких полях могут закончить игру одновременно
+    :param keep: Количество хранимых игр
+    """
+
+    MAGIC = b'TCG1'
+    HEADER = struct.Struct('<4sIHI')
+    MOVE = struct.Struct('<HbbBB')
+    SUFFIX = '.tcg'
+    KEEP = 10000
+
+    def __init__(self, path: Path = Path('games'), name: str = '', keep: int = KEEP) -> None:
+        self.path = path
+        self.name = name
+        self.keep = keep
+        self.game = Game()
+
+    def start(self) -> None:
+        """
+        Начало новой игры
+        """
+        self.game = Game()
+
+    def move(self, level: int, piece) -> None:
+        """
+        Фигура установлена на поле
+
+        :param level: Уровень
+        :param piece: Фигура
+        """
+        self.game.moves.append(Move(level, piece.x, piece.y, [list(row) for row in piece.shape]))
+
+    def finish(self, score: int, level: int) -> None:
+        """
+        Завершение игры и запись ее в файл
+
+        :param score: Итоговый счет
+        :param level: Итоговый уровень
+        """
+        self.game.score = score
+        self.game.level = level
+        if self.game.moves:
+            self.path.mkdir(parents=True, exist_ok=True)
+            name = datetime.now().strftime('%Y%m%d-%H%M%S-%f') + (f'-{self.name}' if self.name else '') + \
+                GameLog.SUFFIX
+            # Запись через временный файл: при сбое питания в каталоге не остается недописанных игр
+            tmp = self.path / (name + '.tmp')
+            tmp.write_bytes(GameLog.encode(self.game))
+            os.replace(tmp, self.path / name)
+            prune(self.path, GameLog.SUFFIX, self.keep)
+        self.game = Game()
+
+    @staticmethod
+    def encode(game: Game) -> bytes:
+        """
+        Преобразование игры в байты
+
+        :param game: Игра
+        :return: Содержимое файла
+        """
+        data = bytearray(GameLog.HEADER.pack(GameLog.MAGIC, game.score, game.level, len(game.moves)))
+        for move in game.moves:
+            data += GameLog.MOVE.pack(move.level, move.x, move.y, len(move.shape), len(move.shape[0]))
+            data += bytes(value for row in move.shape for value in row)
+        return bytes(data)
+
+    @staticmethod
+    def decode(data: bytes) -> Game:
+        """
+        Восстановление игры из байтов
+
+        :param data: Содержимое файла
+        :return: Игра
+        """
+        magic, score, level, cnt = GameLog.HEADER.unpack_from(data)
+        if magic != GameLog.MAGIC:
+            raise ValueError('Unknown game log format')
+        game = Game(score, level)
+        offset = GameLog.HEADER.size
+        for _ in range(cnt):
+            move_level, x, y, rows, cols = GameLog.MOVE.unpack_from(data, offset)
+            offset += GameLog.MOVE.size
+            shape = [list(data[offset + i * cols:offset + (i + 1) * cols]) for i in range(rows)]
+            offset += rows * cols
+            game.moves.append(Move(move_level, x, y, shape))
+        return game
+
+    @staticmethod
+    def files(path: Path) -> Iterator[Path]:
+        """
+        Перебор файлов игр в каталоге и его подкаталогах без построения полного списка
+
+        :param path: Каталог
+        :return: Генератор путей к файлам
+        """
+        stack = [path]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    elif entry.name.endswith(GameLog.SUFFIX):
+                        yield Path(entry.path)
@@ -1,26 +1,19 @@
 from pygame import display, Rect
 from pygame.font import Font
-from pygame.event import get
+from pygame.event import Event, get
 import pygame.constants
 
-import operator
-from dataclasses import dataclass
-from pathlib import Path
+from typing import Optional
 import time
 
 from System import resource_path
 from DrawObject import DrawObject
+from Leaderboard import Leaderboard, FileLeaderboard, Score
 from Colors import BLACK, WHITE, RED, YELLOW, GREEN, CYAN, BLUE
 
 FONT_M = resource_path(r'fonts/pt-mono.ttf')
 
 
-@dataclass
-class Score:
-    Score: int
-    Name: str
-
-
 class HighScore(DrawObject):
     """
     Рекорды
@@ -32,30 +25,29 @@ class HighScore(DrawObject):
     TOP_OFFSET = 2
     MAX_LENGTH = 11
 
-    def __init__(self, ctx, left_top):
+    def __init__(self, ctx, left_top, leaderboard: Optional[Leaderboard] = None):
         """
 
         :param ctx: Контекст для рисования
         :param left_top: Позиция левого верхнего угла объкта
+        :param leaderboard: Хранилище рекордов. Если не задано, то рекорды хранятся в файле highscores.txt
         """
         super().__init__(ctx, left_top)
         self.font_m = Font(FONT_M, 24)
         self.char_size = self.font_m.size(' ')
-        self.file = Path('highscores.txt')
-        self.scores: list[Score] = []
-        if self.file.is_file():
-            with open(self.file, 'r', encoding='utf-8') as file:
-                for line in file:
-                    score_name = line.strip().split('\t')
-                    if len(score_name) == 2:
-                        (score, name) = score_name
-                    else:
-                        score = line
-                        name = ''
-                    score = int(score)
-                    self.scores.append(Score(score, name))
-
-    def draw(self) -> None:
+        self.leaderboard = leaderboard if leaderboard else FileLeaderboard(size=HighScore.NO_OF_HIGH_SCORES)
+
+    @property
+    def scores(self) -> list[Score]:
+        return self.leaderboard.top()
+
+    def draw(self, scores: Optional[list[Score]] = None) -> None:
+        """
+        Рисует таблицу рекордов
+
+        :param scores: Рекорды для вывода. Если не заданы, то выводятся рекорды из хранилища
+        """
+        scores = scores if scores is not None else self.scores
         self.ctx.fill(BLACK)
         width = self.ctx.get_width()
 
@@ -68,8 +60,7 @@ class HighScore(DrawObject):
         self.ctx.blit(text_surface, ((width - text_surface.get_width()) // 2, top_offset))
         top_offset += char_height * HighScore.TOP_OFFSET
 
-        for index, score in enumerate(self.scores +
-                                      [Score(0, 'TETCOLOR')] * (HighScore.NO_OF_HIGH_SCORES - len(self.scores))):
+        for index, score in enumerate(scores + [Score(0, 'TETCOLOR')] * (HighScore.NO_OF_HIGH_SCORES - len(scores))):
             if index < 1:
                 color = RED
             elif index < 3:
@@ -88,21 +79,35 @@ class HighScore(DrawObject):
             self.ctx.blit(text_surface, (left_offset + char_width * 16, top_offset))
             top_offset += char_height
 
+    def qualifies(self, score: int) -> bool:
+        """
+        Проверка счета на попадание в таблицу рекордов
+
+        :param score: Счет
+        :return: True, если счет попадает в таблицу
+        """
+        scores = self.scores
+        return score > 0 and (len(scores) < HighScore.NO_OF_HIGH_SCORES or score > scores[-1].Score)
+
+    def submit(self, score: int, name: str) -> None:
+        """
+        Добавление рекорда в хранилище
+
+        :param score: Счет
+        :param name: Имя игрока
+        """
+        self.leaderboard.submit(Score(score, name if name else 'Anonymous'))
+
     def add_score(self, score: int) -> None:
-        if score > 0 and (len(self.scores) < HighScore.NO_OF_HIGH_SCORES or score > self.scores[-1].Score):
-            item = Score(score, '')
-            self.scores.append(item)
-            self.scores.sort(key=operator.attrgetter('Score'), reverse=True)
-            a = self.scores.count(item)
-            if len(self.scores) > HighScore.NO_OF_HIGH_SCORES:
-                self.scores = self.scores[:HighScore.NO_OF_HIGH_SCORES]
-            self.draw()
+        if self.qualifies(score):
+            scores = self.scores
+            # Место нового рекорда: после рекордов с таким же или большим счетом
+            index = sum(1 for e in scores if e.Score >= score)
+            # Пока вводится имя, в таблице уже стоит новый рекорд, а рекорды ниже него сдвинуты
+            self.draw((scores[:index] + [Score(score, '')] + scores[index:])[:HighScore.NO_OF_HIGH_SCORES])
             name = self.show_input((self.char_size[0] * (HighScore.LEFT_OFFSET + 4),
-                                    self.char_size[1] * (self.scores.index(item) + HighScore.TOP_OFFSET + 1)))
-            item.Name = name if name else 'Anonymous'
-            with open(self.file, 'w', encoding='utf-8') as file:
-                for score in self.scores:
-                    file.write(f"{score.Score}\t{score.Name}\n")
+                                    self.char_size[1] * (index + HighScore.TOP_OFFSET + 1)))
+            self.submit(score, name)
 
     def show_input(self, topleft: tuple[int, int]) -> str:
         self.font_m.set_italic(False)
@@ -110,8 +115,8 @@ class HighScore(DrawObject):
         fill_rect = self.font_m.render(' ' * HighScore.MAX_LENGTH, True, WHITE).get_rect()
         fill_rect.topleft = topleft
 
-        text = ''
-        img = self.font_m.render(text, True, WHITE)
+        entry = NameEntry(0)
+        img = self.font_m.render(entry.text, True, WHITE)
         text_rect = img.get_rect()
         text_rect.topleft = topleft
         cursor = Rect(text_rect.topright, (3, text_rect.height))
@@ -125,17 +130,8 @@ class HighScore(DrawObject):
                     case pygame.QUIT:
                         running = False
                     case pygame.KEYDOWN:
-                        match event.key:
-                            case pygame.K_BACKSPACE:
-                                if len(text) > 0:
-                                    text = text[:-1]
-                            case pygame.K_RETURN | pygame.K_ESCAPE:
-                                running = False
-                            case _:
-                                text += event.unicode
-                                if len(text) == HighScore.MAX_LENGTH:
-                                    running = False
-                        img = self.font_m.render(text, True, WHITE)
+                        running = not entry.key(event)
+                        img = self.font_m.render(entry.text, True, WHITE)
                         text_rect.size = img.get_size()
                         cursor.topleft = text_rect.topright
 
@@ -147,4 +143,33 @@ class HighScore(DrawObject):
             display.update()
             clock.tick(100)
 
-        return text
+        return entry.text
+
+
+class NameEntry:
+    """
+    Ввод имени для нового рекорда по одному нажатию клавиши. Не ждет ввода, поэтому на других полях
+    игра продолжается
+
+    :param score: Счет
+    """
+
+    def __init__(self, score: int) -> None:
+        self.score = score
+        self.text = ''
+
+    def key(self, event: Event) -> bool:
+        """
+        Обработка нажатия клавиши
+
+        :param event: Событие KEYDOWN
+        :return: True, если ввод закончен
+        """
+        match event.key:
+            case pygame.K_BACKSPACE:
+                self.text = self.text[:-1]
+            case pygame.K_RETURN | pygame.K_ESCAPE:
+                return True
+            case _:
+                self.text += event.unicode
+        return len(self.text) == HighScore.MAX_LENGTH
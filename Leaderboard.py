@@ -0,0 +1,280 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from http.client import HTTPConnection, HTTPException
+from pathlib import Path
+from queue import Queue, Empty, Full
+from threading import Thread, Event, Lock
+from typing import Optional
+from urllib.parse import urlsplit
+import json
+import operator
+import time
+
+
+@dataclass
+class Score:
+    Score: int
+    Name: str
+
+
+class Leaderboard(ABC):
+    """
+    Хранилище рекордов
+
+    Метод top вызывается при каждой отрисовке таблицы рекордов и не должен ждать ввода-вывода.
+
+    :param size: Количество рекордов в таблице
+    """
+
+    SIZE = 30
+
+    def __init__(self, size: int = SIZE) -> None:
+        self.size = size
+
+    @abstractmethod
+    def top(self) -> list[Score]:
+        """
+        Лучшие рекорды по убыванию счета
+
+        :return: Не больше size рекордов
+        """
+
+    @abstractmethod
+    def submit(self, score: Score) -> None:
+        """
+        Добавление рекорда
+
+        :param score: Рекорд
+        """
+
+    def close(self) -> None:
+        """
+        Завершение работы с хранилищем
+        """
+        pass
+
+
+class FileLeaderboard(Leaderboard):
+    """
+    Рекорды в локальном файле: по строке на рекорд, счет и имя через табуляцию
+
+    :param path: Файл рекордов
+    :param size: Количество рекордов в таблице
+    """
+
+    def __init__(self, path: Path = Path('highscores.txt'), size: int = Leaderboard.SIZE) -> None:
+        super().__init__(size)
+        self.path = path
+        self.scores: list[Score] = []
+        if self.path.is_file():
+            with open(self.path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    score_name = line.strip().split('\t')
+                    if len(score_name) == 2:
+                        (score, name) = score_name
+                    else:
+                        score = line
+                        name = ''
+                    score = int(score)
+                    self.scores.append(Score(score, name))
+
+    def top(self) -> list[Score]:
+        return self.scores
+
+    def submit(self, score: Score) -> None:
+        self.scores.append(score)
+        self.scores.sort(key=operator.attrgetter('Score'), reverse=True)
+        del self.scores[self.size:]
+        with open(self.path, 'w', encoding='utf-8') as file:
+            for score in self.scores:
+                file.write(f"{score.Score}\t{score.Name}\n")
+
+
+class ConnectionPool:
+    """
+    Пул постоянных (keep-alive) соединений HTTP с одним сервером
+
+    :param host: Сервер
+    :param port: Порт
+    :param size: Максимальное количество простаивающих соединений
+    :param timeout: Таймаут соединения, с
+    """
+
+    def __init__(self, host: str, port: int, size: int = 1, timeout: float = 5.0) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.idle: Queue[HTTPConnection] = Queue(size)
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None) -> bytes:
+        """
+        Выполнение запроса. Если сервер закрыл простаивавшее соединение, то запрос повторяется в новом
+
+        :param method: Метод HTTP
+        :param path: Путь
+        :param body: Тело запроса JSON
+        :return: Тело ответа
+        """
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            try:
+                connection = self.idle.get_nowait()
+                reused = True
+            except Empty:
+                connection = HTTPConnection(self.host, self.port, timeout=self.timeout)
+                reused = False
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, HTTPException):
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            if response.status != 200:
+                connection.close()
+                raise HTTPException(f'{method} {path}: {response.status} {response.reason}')
+            if response.will_close:
+                connection.close()
+            else:
+                try:
+                    self.idle.put_nowait(connection)
+                except Full:
+                    connection.close()
+            return data
+
+    def close(self) -> None:
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except Empty:
+                break
+
+
+class HttpLeaderboard(Leaderboard):
+    """
+    Рекорды на сервере HTTP (LeaderboardServer.py)
+
+    Рекорды отправляются фоновым потоком пакетами по постоянным соединениям пула. Таблица рекордов
+    запрашивается тем же потоком и хранится локально ttl секунд, поэтому top только читает кэш.
+    Отправленные, но еще не подтвержденные сервером рекорды показываются в таблице сразу. Если сервер
+    недоступен, то рекорды остаются в очереди и отправляются повторно.
+
+    :param url: Адрес сервера
+    :param size: Количество рекордов в таблице
+    :param ttl: Время хранения таблицы рекордов, с
+    :param batch: Максимальное количество рекордов в одном запросе
+    :param interval: Время накопления пакета рекордов, с
+    :param connections: Размер пула соединений
+    """
+
+    TTL = 30.0
+    BATCH = 100
+    INTERVAL = 0.5
+    RETRY = 5.0
+
+    def __init__(self, url: str, size: int = Leaderboard.SIZE, ttl: float = TTL, batch: int = BATCH,
+                 interval: float = INTERVAL, connections: int = 1) -> None:
+        super().__init__(size)
+        parts = urlsplit(url)
+        self.pool = ConnectionPool(parts.hostname, parts.port or 80, connections)
+        self.ttl = ttl
+        self.batch = batch
+        self.interval = interval
+
+        self.lock = Lock()
+        self.scores: list[Score] = []
+        self.pending: list[Score] = []
+        self.view: list[Score] = []
+        self.expires = 0.0
+
+        self.queue: Queue[Optional[Score]] = Queue()
+        self._stop = Event()
+        self._thread = Thread(target=self._run, name='leaderboard', daemon=True)
+        self._thread.start()
+
+    def top(self) -> list[Score]:
+        return self.view
+
+    def submit(self, score: Score) -> None:
+        with self.lock:
+            self.pending.append(score)
+            self._update_view()
+        self.queue.put(score)
+
+    def _update_view(self) -> None:
+        # Новый список вместо изменения старого: top возвращает его без блокировки
+        self.view = sorted(self.scores + self.pending, key=operator.attrgetter('Score'), reverse=True)[:self.size]
+
+    def _take(self, timeout: float) -> list[Score]:
+        """
+        Накопление пакета рекордов
+
+        :param timeout: Максимальное время ожидания первого рекорда, с
+        :return: Пакет, возможно пустой
+        """
+        batch = []
+        try:
+            score = self.queue.get(timeout=timeout)
+            deadline = time.monotonic() + self.interval
+            # None в очереди - сигнал завершения от close
+            while score is not None:
+                batch.append(score)
+                if len(batch) == self.batch:
+                    break
+                score = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+        except Empty:
+            pass
+        return batch
+
+    def _send(self, batch: list[Score]) -> bool:
+        body = json.dumps([{'score': e.Score, 'name': e.Name} for e in batch]).encode()
+        try:
+            self.pool.request('POST', '/scores', body)
+        except (OSError, HTTPException, ValueError):
+            return False
+        with self.lock:
+            for e in batch:
+                self.pending.remove(e)
+            # Отправленные рекорды остаются в таблице до следующего запроса ее с сервера
+            self.scores = sorted(self.scores + batch, key=operator.attrgetter('Score'), reverse=True)[:self.size]
+            self._update_view()
+        return True
+
+    def _refresh(self) -> None:
+        try:
+            scores = [Score(e['score'], e['name'])
+                      for e in json.loads(self.pool.request('GET', f'/top?n={self.size}'))]
+        except (OSError, HTTPException, ValueError, KeyError):
+            self.expires = time.monotonic() + min(self.ttl, HttpLeaderboard.RETRY)
+            return
+        with self.lock:
+            self.scores = scores
+            self._update_view()
+        self.expires = time.monotonic() + self.ttl
+
+    def _run(self) -> None:
+        retry: list[Score] = []
+        while not self._stop.is_set():
+            if time.monotonic() >= self.expires:
+                self._refresh()
+            batch = retry or self._take(max(min(self.expires - time.monotonic(), self.ttl), 0))
+            if batch and not self._send(batch):
+                retry = batch
+                self._stop.wait(HttpLeaderboard.RETRY)
+            else:
+                retry = []
+        # Отправка оставшихся рекордов при завершении
+        batch = retry
+        while not self.queue.empty():
+            if (score := self.queue.get_nowait()) is not None:
+                batch.append(score)
+        for i in range(0, len(batch), self.batch):
+            self._send(batch[i:i + self.batch])
+
+    def close(self) -> None:
+        self._stop.set()
+        self.queue.put(None)
+        self._thread.join()
+        self.pool.close()
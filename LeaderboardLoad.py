@@ -0,0 +1,74 @@
+from argparse import ArgumentParser
+from http.client import HTTPConnection
+from multiprocessing import Process
+import json
+import random
+import sys
+import time
+
+from Leaderboard import HttpLeaderboard, Score
+from LeaderboardServer import serve
+
+
+def stats(host: str, port: int) -> dict:
+    connection = HTTPConnection(host, port, timeout=10)
+    connection.request('GET', '/stats')
+    result = json.loads(connection.getresponse().read())
+    connection.close()
+    return result
+
+
+def main():
+    parser = ArgumentParser(description='Нагрузочный тест сервера рекордов TETCOLOR: много игровых автоматов '
+                                        'одновременно отправляют рекорды и читают таблицу рекордов')
+    parser.add_argument('-c', '--cabinets', type=int, default=2000, help='Количество игровых автоматов')
+    parser.add_argument('-g', '--games', type=int, default=20, help='Количество игр на каждом автомате')
+    parser.add_argument('-i', '--interval', type=float, default=0.1, help='Время между играми, с')
+    parser.add_argument('--host', default='127.0.0.1', help='Адрес сервера')
+    parser.add_argument('-p', '--port', type=int, default=8765, help='Порт сервера')
+    parser.add_argument('--external', action='store_true', help='Не запускать локальный сервер')
+    args = parser.parse_args()
+
+    server = None
+    if not args.external:
+        server = Process(target=serve, args=(args.host, args.port), daemon=True)
+        server.start()
+        time.sleep(0.5)
+    before = stats(args.host, args.port)
+
+    url = f'http://{args.host}:{args.port}'
+    cabinets = [HttpLeaderboard(url, ttl=5.0) for _ in range(args.cabinets)]
+    worst = 0.0
+    total = 0.0
+    start = time.monotonic()
+    for game in range(args.games):
+        for cabinet in cabinets:
+            cabinet.submit(Score(random.randrange(1, 100000), f'cab{id(cabinet) % 10000}'))
+            t = time.perf_counter()
+            cabinet.top()
+            elapsed = time.perf_counter() - t
+            total += elapsed
+            worst = max(worst, elapsed)
+        print(f'\rgame {game + 1}/{args.games}', end='', file=sys.stderr)
+        time.sleep(args.interval)
+    for cabinet in cabinets:
+        cabinet.close()
+    elapsed = time.monotonic() - start
+
+    after = stats(args.host, args.port)
+    sent = args.cabinets * args.games
+    submitted = after['submitted'] - before['submitted']
+    # Запрос /stats тоже учитывается сервером
+    requests = after['requests'] - before['requests'] - 1
+    print(f'\r{args.cabinets} cabinets, {sent} scores in {elapsed:.1f} s, {submitted / elapsed:.0f} scores/s, '
+          f'{requests} requests ({submitted / max(requests, 1):.1f} scores per request)')
+    print(f'top(): average {total / sent * 1e6:.1f} us, worst {worst * 1e6:.1f} us')
+    if submitted != sent:
+        print(f'lost {sent - submitted} scores', file=sys.stderr)
+    if server:
+        server.terminate()
+    sys.exit(submitted != sent)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+from argparse import ArgumentParser
+from bisect import insort
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from urllib.parse import urlsplit, parse_qs
+import json
+
+
+class Scores:
+    """
+    Таблица рекордов сервера
+
+    :param size: Количество хранимых рекордов
+    """
+
+    SIZE = 1000
+
+    def __init__(self, size: int = SIZE) -> None:
+        self.size = size
+        self.lock = Lock()
+        # Рекорды по возрастанию: (Счет, Номер, Имя). Номер сохраняет порядок добавления рекордов с равным счетом
+        self.scores: list[tuple[int, int, str]] = []
+        self.submitted = 0
+        self.requests = 0
+
+    def request(self) -> None:
+        with self.lock:
+            self.requests += 1
+
+    def add(self, scores: list[tuple[int, str]]) -> None:
+        with self.lock:
+            for score, name in scores:
+                self.submitted += 1
+                if len(self.scores) < self.size or score > self.scores[0][0]:
+                    insort(self.scores, (score, -self.submitted, name))
+                    if len(self.scores) > self.size:
+                        del self.scores[0]
+
+    def top(self, n: int) -> list[dict]:
+        with self.lock:
+            return [{'score': score, 'name': name} for score, _, name in reversed(self.scores[-n:])]
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Запросы к серверу рекордов:
+
+    - POST /scores - добавление пакета рекордов: [{"score": 100, "name": "Name"}, ...]
+    - GET /top?n=30 - лучшие рекорды
+    - GET /stats - количество запросов и полученных рекордов
+    """
+
+    protocol_version = 'HTTP/1.1'
+    MAX_BODY = 1 << 20
+    MAX_NAME = 32
+
+    def reply(self, data, status: int = 200) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        scores: Scores = self.server.scores
+        scores.request()
+        url = urlsplit(self.path)
+        match url.path:
+            case '/top':
+                try:
+                    n = int(parse_qs(url.query).get('n', ['30'])[0])
+                except ValueError:
+                    return self.reply({'error': 'bad n'}, 400)
+                self.reply(scores.top(max(0, min(n, scores.size))))
+            case '/stats':
+                self.reply({'requests': scores.requests, 'submitted': scores.submitted})
+            case _:
+                self.reply({'error': 'not found'}, 404)
+
+    def do_POST(self) -> None:
+        scores: Scores = self.server.scores
+        scores.request()
+        if self.path != '/scores':
+            return self.reply({'error': 'not found'}, 404)
+        length = int(self.headers.get('Content-Length', 0))
+        if length > Handler.MAX_BODY:
+            self.close_connection = True
+            return self.reply({'error': 'too large'}, 413)
+        try:
+            items = [(int(e['score']), str(e['name'])[:Handler.MAX_NAME])
+                     for e in json.loads(self.rfile.read(length))]
+        except (ValueError, KeyError, TypeError):
+            return self.reply({'error': 'bad request'}, 400)
+        scores.add(items)
+        self.reply({'accepted': len(items)})
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def serve(host: str = '127.0.0.1', port: int = 8765) -> None:
+    """
+    Запуск сервера
+
+    :param host: Адрес
+    :param port: Порт
+    """
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.scores = Scores()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = ArgumentParser(description='Локальный сервер рекордов TETCOLOR')
+    parser.add_argument('--host', default='127.0.0.1', help='Адрес')
+    parser.add_argument('-p', '--port', type=int, default=8765, help='Порт')
+    args = parser.parse_args()
+    serve(args.host, args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+# Сообщение pygame при импорте попало бы в поток кадров --raw
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from pygame import Surface, surfarray, image
+import pygame
+
+from argparse import ArgumentParser
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Iterator, Optional
+import numpy
+import sys
+import time
+
+from Board import Board, Piece
+from GameLog import GameLog, Game
+from HighScore import HighScore
+from Rules import Rules
+from Score import Score
+from Colors import BLACK, GRAY
+
+
+@dataclass
+class State:
+    """
+    Состояние игры для одного кадра
+    """
+    colors: bytes
+    selected: bytes
+    opacity: int
+    score: int
+    level: int
+    game_over: bool = False
+    # Бонус за удаления подряд и номер мигания, как Score.bonus_cnt
+    bonus: int = 0
+    bonus_cnt: int = 0
+    # Score.draw читает паузу, а в записанной игре пауз нет
+    pause = False
+
+
+def states(game: Game) -> Iterator[State]:
+    """
+    Повторная симуляция игры с формированием состояний для кадров: по одному кадру на каждую
+    установленную фигуру, по Board.MAX_OPACITY кадров на каждое удаление линий и Score.BLINKS кадров
+    мигания бонуса после удалений подряд
+
+    :param game: Игра
+    :return: Генератор состояний
+    """
+    rules = Rules()
+
+    def state(opacity: int = 0, game_over: bool = False, bonus: int = 0, bonus_cnt: int = 0) -> State:
+        return State(rules.colors(), rules.selection(), opacity, rules.score, level, game_over, bonus, bonus_cnt)
+
+    level = 0
+    for move in game.moves:
+        level = move.level
+        rules.freeze(move)
+        rules.score += rules.level_points(level)
+        yield state()
+        bonus_list = []
+        while bonus_type := rules.select_grid():
+            bonus_list.append(bonus_type)
+            for opacity in range(Board.MAX_OPACITY, 0, -1):
+                yield state(opacity)
+            rules.clear_lines()
+        bonus = rules.cascade_bonus(bonus_list)
+        rules.score += bonus
+        if bonus:
+            for bonus_cnt in range(1, Score.BLINKS + 1):
+                yield state(bonus=bonus, bonus_cnt=bonus_cnt)
+    yield state(game_over=True)
+
+
+class FrameScore(Score):
+    """
+    Панель счета для кадров: мигание бонуса задается состоянием кадра, а не часами игры, поэтому кадры
+    можно формировать в любом порядке в разных процессах
+    """
+
+    def draw_bonus(self, bottom_offset: float) -> None:
+        if self.board.bonus:
+            self.show_bonus(bottom_offset, self.board.bonus, self.board.bonus_cnt % 2 != 0)
+
+
+class Renderer:
+    """
+    Формирование кадров игры без окна
+
+    Панели счета и рекордов рисуются методами Score.draw и HighScore.draw, а игровое поле формируется
+    сразу в массиве пикселей и переносится на поверхность через pygame.surfarray.
+    """
+
+    WIDTH_LIST = (460, Board.BLOCK_SIZE * Board.COLS, 460)
+    HEIGHT = Board.BLOCK_SIZE * Board.ROWS
+
+    def __init__(self) -> None:
+        pygame.init()
+        self.surface = Surface((sum(Renderer.WIDTH_LIST), Renderer.HEIGHT))
+        self.board = Surface((Renderer.WIDTH_LIST[1], Renderer.HEIGHT))
+        # Таблица рекордов во время формирования кадров не меняется
+        self.high_score = HighScore(Surface((Renderer.WIDTH_LIST[0], Renderer.HEIGHT)), (0, 0))
+        self.high_score.draw()
+        # Score.draw читает у Board только поля, которые есть в State
+        self.score = FrameScore(Surface((Renderer.WIDTH_LIST[2], Renderer.HEIGHT)), (0, 0),
+                           State(b'', b'', 0, 0, 0))
+        self.palette = numpy.array(Piece.COLORS, dtype=numpy.int32)
+        self.pixels = numpy.empty((Board.COLS * Board.BLOCK_SIZE, Board.ROWS * Board.BLOCK_SIZE, 3), numpy.uint8)
+
+    def draw_board(self, state: State) -> None:
+        """
+        Рисует игровое поле так же, как Board.draw_board, но без вызова draw.rect для каждой клетки
+
+        :param state: Состояние игры
+        """
+        size, width = Board.BLOCK_SIZE, Board.BORDER_WIDTH
+        colors = numpy.frombuffer(state.colors, numpy.uint8).reshape(Board.COLS, Board.ROWS)
+        selected = numpy.frombuffer(state.selected, numpy.uint8).reshape(Board.COLS, Board.ROWS).astype(bool)
+        occupied = colors > 0
+
+        cells = self.palette[colors]
+        if state.opacity:
+            faded = self.palette - self.palette * (Board.MAX_OPACITY - state.opacity + 1) // Board.MAX_OPACITY
+            cells[selected] = faded[colors[selected]]
+        cells[~occupied] = GRAY
+        pixels = self.pixels
+        pixels[:] = cells.repeat(size, axis=0).repeat(size, axis=1)
+
+        # Рамки клеток: полосы шириной BORDER_WIDTH по границам занятых клеток.
+        # Рамка клетки шире клетки на BORDER_WIDTH и заходит на соседнюю клетку справа и снизу
+        for grid, transposed in ((occupied, False), (occupied.T, True)):
+            lines, cols = grid.shape
+            edges = numpy.zeros((lines + 1, cols), bool)
+            edges[:-1] |= grid
+            edges[1:] |= grid
+            strips = edges.repeat(size, axis=1).reshape(lines + 1, cols, size)
+            strips[:, 1:, :width] |= edges[:, :-1, None]
+            mask = numpy.zeros((lines + 1, size, cols * size), bool)
+            mask[:, :width, :] = strips.reshape(lines + 1, 1, cols * size)
+            mask = mask.reshape((lines + 1) * size, cols * size)[:lines * size]
+            pixels[mask.T if transposed else mask] = BLACK
+
+        surfarray.blit_array(self.board, pixels)
+        pygame.draw.rect(self.board, BLACK, (0, 0, self.board.get_width(), self.board.get_height()), width=2)
+
+    def render(self, state: State) -> Surface:
+        """
+        Формирует кадр
+
+        :param state: Состояние игры
+        :return: Поверхность с кадром
+        """
+        self.score.board = state
+        self.score.draw()
+        self.draw_board(state)
+        self.surface.blit(self.score.ctx, (0, 0))
+        self.surface.blit(self.board, (Renderer.WIDTH_LIST[0], 0))
+        self.surface.blit(self.high_score.ctx, (sum(Renderer.WIDTH_LIST[:2]), 0))
+        return self.surface
+
+
+renderer: Optional[Renderer] = None
+
+
+def init_worker() -> None:
+    global renderer
+    renderer = Renderer()
+
+
+def render_range(task: tuple[int, list[State], Optional[Path]]) -> tuple[int, list[bytes]]:
+    """
+    Формирует кадры диапазона в процессе пула
+
+    :param task: Номер первого кадра, состояния кадров, каталог для PNG. Если каталог не задан,
+    то кадры возвращаются в виде байтов RGB
+    :return: Количество кадров и байты RGB кадров
+    """
+    first, frames, output = task
+    result = []
+    for index, state in enumerate(frames, first):
+        surface = renderer.render(state)
+        if output:
+            image.save(surface, output / f'frame_{index:06}.png')
+        else:
+            result.append(image.tobytes(surface, 'RGB'))
+    return len(frames), result
+
+
+def tasks(game: Game, chunk: int, output: Optional[Path]) -> Iterator[tuple[int, list[State], Optional[Path]]]:
+    frames = []
+    first = 0
+    for state in states(game):
+        frames.append(state)
+        if len(frames) == chunk:
+            yield first, frames, output
+            first += len(frames)
+            frames = []
+    if frames:
+        yield first, frames, output
+
+
+def write(result: tuple[int, list[bytes]]) -> int:
+    """
+    Вывод кадров RGB в stdout
+
+    :param result: Результат render_range
+    :return: Количество кадров
+    """
+    frames, data = result
+    for frame in data:
+        sys.stdout.buffer.write(frame)
+    return frames
+
+
+def main():
+    parser = ArgumentParser(description='Формирование кадров записанной игры TETCOLOR')
+    parser.add_argument('game', type=Path, help='Файл записанной игры')
+    parser.add_argument('-o', '--output', type=Path, help='Каталог для кадров PNG')
+    parser.add_argument('--raw', action='store_true', help='Выводить кадры RGB в stdout для внешнего кодировщика')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help='Количество процессов')
+    parser.add_argument('-c', '--chunk', type=int, default=16, help='Количество кадров в одном задании')
+    args = parser.parse_args()
+    if not args.raw and not args.output:
+        parser.error('one of --output or --raw is required')
+
+    game = GameLog.decode(args.game.read_bytes())
+    output = None if args.raw else args.output
+    if output:
+        output.mkdir(parents=True, exist_ok=True)
+
+    cnt = 0
+    start = time.monotonic()
+    with Pool(args.workers, initializer=init_worker) as pool:
+        # Заданий в работе не больше двух на процесс: если кодировщик читает кадры медленнее, чем они
+        # формируются, готовые кадры не накапливаются в памяти
+        pending = deque()
+        for task in tasks(game, args.chunk, output):
+            if len(pending) >= args.workers * 2:
+                cnt += write(pending.popleft().get())
+            pending.append(pool.apply_async(render_range, (task,)))
+        while pending:
+            cnt += write(pending.popleft().get())
+        # Выход из with вызывает terminate, а pygame в процессах пула перехватывает SIGTERM, и завершение
+        # пула ждало бы процессы бесконечно
+        pool.close()
+        pool.join()
+    elapsed = max(time.monotonic() - start, 1e-9)
+    print(f'{cnt} frames {sum(Renderer.WIDTH_LIST)}x{Renderer.HEIGHT}, {elapsed:.1f} s, {cnt / elapsed:.0f} fps',
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+import mmap
+import struct
+
+from System import prune
+
+
+class Recorder:
+    """
+    Запись повтора игры: действия игрока по тикам часов и периодические снимки полного состояния Board
+
+    Запись начинается с первого тика после начала игры и заканчивается вместе с игрой. Имена файлов
+    формируются как в GameLog, в каталоге остается не больше keep последних повторов.
+
+    :param path: Каталог для записи повторов
+    :param interval: Период снимков состояния, тики
+    :param name: Имя записи в именах файлов, например номер поля
+    :param keep: Количество хранимых повторов
+    """
+
+    INTERVAL = 500
+    SUFFIX = '.tcr'
+    KEEP = 1000
+
+    def __init__(self, path: Path = Path('replays'), interval: int = INTERVAL, name: str = '',
+                 keep: int = KEEP) -> None:
+        self.path = path
+        self.interval = interval
+        self.name = name
+        self.keep = keep
+        self.recording = False
+        self.start_tick: Optional[int] = None
+        self.ticks = array('I')
+        self.keys = array('I')
+        self.index = array('I')
+        self.keyframes = bytearray()
+
+    def start(self) -> None:
+        """
+        Начало новой игры
+        """
+        self.recording = True
+        self.start_tick = None
+        self.ticks = array('I')
+        self.keys = array('I')
+        self.index = array('I')
+        self.keyframes = bytearray()
+
+    def tick(self, board) -> None:
+        """
+        Начало обработки тика игровым полем. Вызывается из Board.drop
+
+        :param board: Игровое поле
+        """
+        if not self.recording:
+            return
+        if self.start_tick is None:
+            self.start_tick = board.clock.ticks
+        if (board.clock.ticks - self.start_tick) % self.interval == 0:
+            self.index.append(len(self.keys))
+            self.keyframes += board.snapshot()
+
+    def action(self, tick: int, key: int) -> None:
+        """
+        Действие игрока
+
+        :param tick: Тик часов, на котором выполнено действие
+        :param key: Действие
+        """
+        if self.recording and self.start_tick is not None:
+            self.ticks.append(tick - self.start_tick)
+            self.keys.append(key)
+
+    def finish(self, board) -> None:
+        """
+        Завершение игры и запись повтора в файл
+
+        :param board: Игровое поле
+        """
+        if self.recording and self.index:
+            self.path.mkdir(parents=True, exist_ok=True)
+            name = datetime.now().strftime('%Y%m%d-%H%M%S-%f') + (f'-{self.name}' if self.name else '') + \
+                Recorder.SUFFIX
+            # Игра может закончиться действием, выполненным на текущем тике, поэтому он тоже входит в повтор
+            Replay.write(self.path / name, self.interval, board.clock.ticks - self.start_tick + 1, board.score,
+                         len(board.snapshot()), self.keyframes, self.index, self.ticks, self.keys)
+            prune(self.path, Recorder.SUFFIX, self.keep)
+        self.recording = False
+
+
+class Replay:
+    """
+    Чтение повтора игры с переходом к любому тику
+
+    Файл открывается через mmap, снимки и массивы действий читаются срезами memoryview без копирования.
+    Переход к тику восстанавливает ближайший предыдущий снимок и повторяет не больше interval тиков.
+
+    Формат файла: заголовок, снимки состояния фиксированного размера, индекс (номер первого действия после
+    каждого снимка), тики действий, действия. Секции выравниваются на 8 байт.
+
+    :param path: Файл повтора
+    """
+
+    MAGIC = b'TCR2'
+    HEADER = struct.Struct('<4sIIIIIIQQQQ')
+    ALIGN = 8
+
+    def __init__(self, path: Path) -> None:
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mm)
+        (magic, self.interval, self.length, self.score, self.keyframe_size, self.keyframe_cnt, self.input_cnt,
+         self.keyframes_offset, index_offset, ticks_offset, keys_offset) = Replay.HEADER.unpack_from(self.view)
+        if magic != Replay.MAGIC:
+            self.close()
+            raise ValueError('Unknown replay format')
+        self.index = self.view[index_offset:index_offset + 4 * self.keyframe_cnt].cast('I')
+        self.ticks = self.view[ticks_offset:ticks_offset + 4 * self.input_cnt].cast('I')
+        self.keys = self.view[keys_offset:keys_offset + 4 * self.input_cnt].cast('I')
+        self.position = 0
+        self.next_input = 0
+
+    @staticmethod
+    def write(path: Path, interval: int, length: int, score: int, keyframe_size: int, keyframes: bytes,
+              index: array, ticks: array, keys: array) -> None:
+        """
+        Запись файла повтора
+
+        :param path: Файл
+        :param interval: Период снимков, тики
+        :param length: Длительность игры, тики
+        :param score: Итоговый счет
+        :param keyframe_size: Размер снимка
+        :param keyframes: Снимки
+        :param index: Номер первого действия после каждого снимка
+        :param ticks: Тики действий от начала игры
+        :param keys: Действия
+        """
+        def align(offset: int) -> int:
+            return (offset + Replay.ALIGN - 1) // Replay.ALIGN * Replay.ALIGN
+
+        keyframes_offset = align(Replay.HEADER.size)
+        index_offset = align(keyframes_offset + len(keyframes))
+        ticks_offset = align(index_offset + 4 * len(index))
+        keys_offset = align(ticks_offset + 4 * len(ticks))
+        with open(path, 'wb') as file:
+            file.write(Replay.HEADER.pack(Replay.MAGIC, interval, length, score, keyframe_size, len(index),
+                                          len(ticks), keyframes_offset, index_offset, ticks_offset, keys_offset))
+            for offset, data in ((keyframes_offset, keyframes), (index_offset, index.tobytes()),
+                                 (ticks_offset, ticks.tobytes()), (keys_offset, keys.tobytes())):
+                file.write(bytes(offset - file.tell()))
+                file.write(data)
+
+    def keyframe(self, k: int) -> memoryview:
+        """
+        Снимок состояния
+
+        :param k: Номер снимка
+        :return: Срез файла со снимком
+        """
+        offset = self.keyframes_offset + k * self.keyframe_size
+        return self.view[offset:offset + self.keyframe_size]
+
+    def seek(self, board, tick: int) -> None:
+        """
+        Переход к состоянию после обработки тика
+
+        :param board: Игровое поле для восстановления состояния
+        :param tick: Тик от начала игры
+        """
+        tick = max(0, min(tick, self.length))
+        k = min(tick // self.interval, self.keyframe_cnt - 1)
+        board.restore(self.keyframe(k))
+        board.drop()
+        self.position = k * self.interval
+        self.next_input = self.index[k]
+        while self.position < tick:
+            self.step(board)
+
+    def step(self, board) -> bool:
+        """
+        Повтор одного тика: действия игрока и падение фигуры
+
+        :param board: Игровое поле
+        :return: False, если повтор закончился
+        """
+        if self.position >= self.length:
+            return False
+        while self.next_input < self.input_cnt and self.ticks[self.next_input] == self.position:
+            board.action(self.keys[self.next_input])
+            self.next_input += 1
+        board.clock.tick()
+        board.drop()
+        self.position += 1
+        return True
+
+    def close(self) -> None:
+        for view in ('index', 'ticks', 'keys'):
+            if hasattr(self, view):
+                getattr(self, view).release()
+        self.view.release()
+        self.mm.close()
+        self.file.close()
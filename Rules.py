@@ -0,0 +1,262 @@
+from typing import Optional
+from itertools import groupby
+from collections import defaultdict
+
+from Telemetry import Telemetry
+
+
+class Rules:
+    """
+    Правила игры без отображения: игровое поле, поиск и удаление линий, подсчет очков
+    """
+    COLS = 7
+    ROWS = 18
+
+    POINTS = (
+        {3: 40, 4: 120, 5: 440, 6: 1560, 7: 5560},
+        {3: 50, 4: 150, 5: 550, 6: 1950, 7: 6950},
+        {3: 75, 4: 225, 5: 825, 6: 2925, 7: 10425}
+    )
+
+    telemetry: Optional[Telemetry] = None
+
+    __slots__ = ('grid', 'score')
+
+    class Grid:
+        """
+        Клетки игрового поля: цвета и признаки отметки для удаления в двух байтовых массивах по колонкам.
+        Клетка (x, y) хранится по индексу x * ROWS + y
+
+        :param colors: Цвета клеток. Если не заданы, то поле пустое
+        :param selected: Признаки отметки клеток. Если не заданы, то клетки не отмечены
+        """
+
+        __slots__ = ('colors', 'selected')
+
+        def __init__(self, colors: bytes = b'', selected: bytes = b'') -> None:
+            size = Rules.COLS * Rules.ROWS
+            self.colors = bytearray(colors) if colors else bytearray(size)
+            self.selected = bytearray(selected) if selected else bytearray(size)
+
+        @staticmethod
+        def index(x: int, y: int) -> int:
+            return x * Rules.ROWS + y
+
+        def __getitem__(self, p: tuple[int, int]) -> int:
+            """
+            Цвет клетки
+
+            :param p: Координаты клетки
+            :return: Цвет, 0 - пустая клетка
+            """
+            x, y = p
+            return self.colors[x * Rules.ROWS + y]
+
+        def __setitem__(self, p: tuple[int, int], color: int) -> None:
+            """
+            Задает цвет клетки и снимает отметку
+
+            :param p: Координаты клетки
+            :param color: Цвет
+            """
+            x, y = p
+            i = x * Rules.ROWS + y
+            self.colors[i] = color
+            self.selected[i] = 0
+
+        def copy(self) -> 'Rules.Grid':
+            return Rules.Grid(self.colors, self.selected)
+
+        def __repr__(self):
+            return ' '.join(''.join(f"{'-' if self.selected[i] else ''}{self.colors[i]}"
+                                    for i in range(x * Rules.ROWS, (x + 1) * Rules.ROWS)) for x in range(Rules.COLS))
+
+    def __init__(self, grid: Optional[Grid] = None) -> None:
+        self.grid = grid if grid else self.get_empty_grid()
+        self.score = 0
+
+    def copy(self) -> 'Rules':
+        """
+        Копия игрового поля и счета
+
+        :return: Новый объект Rules
+        """
+        rules = Rules(self.grid.copy())
+        rules.score = self.score
+        return rules
+
+    def colors(self) -> bytes:
+        """
+        Цвета клеток поля по колонкам
+
+        :return: Байты длиной COLS * ROWS
+        """
+        return bytes(self.grid.colors)
+
+    def selection(self) -> bytes:
+        """
+        Признаки отметки клеток поля для удаления по колонкам
+
+        :return: Байты длиной COLS * ROWS
+        """
+        return bytes(self.grid.selected)
+
+    @staticmethod
+    def from_colors(colors: bytes, score: int = 0, selected: bytes = b'') -> 'Rules':
+        """
+        Создает игровое поле по цветам клеток
+
+        :param colors: Цвета клеток поля по колонкам, как возвращает colors
+        :param score: Счет
+        :param selected: Признаки отметки клеток, как возвращает selection
+        :return: Новый объект Rules
+        """
+        rules = Rules(Rules.Grid(colors, selected))
+        rules.score = score
+        return rules
+
+    def clear_lines(self) -> None:
+        colors, selected = self.grid.colors, self.grid.selected
+        for start in range(0, Rules.COLS * Rules.ROWS, Rules.ROWS):
+            end = start + Rules.ROWS
+            if any(selected[start:end]):
+                col, flags = colors[start:end], selected[start:end]
+                last_empty = 0
+                for y in range(Rules.ROWS):
+                    if flags[y]:
+                        del col[y], flags[y]
+                        col.insert(last_empty, 0)
+                        flags.insert(last_empty, 0)
+                    elif col[y] == 0:
+                        last_empty = y
+                colors[start:end] = col
+                selected[start:end] = flags
+
+    def valid(self, piece) -> bool:
+        # Проверки is_inside_walls и not_occupied без вызова методов: valid вызывается для каждого хода
+        colors = self.grid.colors
+        for dy, row in enumerate(piece.shape):
+            y = piece.y + dy
+            for dx, value in enumerate(row):
+                x = piece.x + dx
+                if value != 0 and not (0 <= x < Rules.COLS and y < Rules.ROWS and colors[x * Rules.ROWS + y] == 0):
+                    return False
+        return True
+
+    def select_grid(self) -> int:
+        """
+        Отметка в матрице групп элементов с длиной более 3
+
+        :return: Тип бонуса:
+        0, если групп нет; 1, если есть только одна группа длиной 3; 2 в остальных случаях
+        """
+        colors, selected = self.grid.colors, self.grid.selected
+
+        def check_grid(lines: tuple[tuple[int, ...], ...]) -> dict:
+            """
+            Проверки на наличие групп одинаковых элеменов длиной более 3
+
+            :param lines: Линии для поиска
+            :return: Словарь вида {Длина: int -> Количество: int}
+            """
+            result = defaultdict(int)
+            for line in lines:
+                for key, value in groupby(line, key=colors.__getitem__):
+                    if key != 0:
+                        if (line_len := len(value_list := tuple(value))) > 2:
+                            result[line_len] += 1
+                            for i in value_list:
+                                selected[i] = 1
+            return result
+
+        lines_cnt = tuple(check_grid(lines) for lines in Rules.LINES)
+
+        bonus_type = 0
+        if any(lines_cnt):
+            for direction, line_cnt in enumerate(lines_cnt):
+                for line_len, cnt in line_cnt.items():
+                    self.score += Rules.POINTS[direction][line_len] * cnt
+                    if self.telemetry:
+                        self.telemetry.line(direction, line_len, cnt)
+                    bonus_type = 2 if bonus_type > 0 or line_len > 3 else 1
+        return bonus_type
+
+    def freeze(self, piece) -> None:
+        """
+        Переносит блоки фигуры на игровое поле
+
+        :param piece: Фигура
+        """
+        if self.telemetry:
+            self.telemetry.piece()
+        for y, row in enumerate(piece.shape):
+            for x, value in enumerate(row):
+                if value > 0:
+                    self.grid[x + piece.x, y + piece.y] = value
+
+    def settle(self) -> list[int]:
+        """
+        Выполняет все удаления линий подряд после установки фигуры, как это происходит в игре
+
+        :return: Список типов бонусов каждого удаления
+        """
+        bonus_list = []
+        while bonus_type := self.select_grid():
+            bonus_list.append(bonus_type)
+            self.clear_lines()
+        self.score += self.cascade_bonus(bonus_list)
+        return bonus_list
+
+    @staticmethod
+    def cascade_bonus(bonus_list: list[int]) -> int:
+        """
+        Бонус за несколько удалений подряд
+
+        :param bonus_list: Список типов бонусов каждого удаления
+        :return: Бонусные очки
+        """
+        if len(bonus_list) > 1:
+            return 500 + 1000 * (len(bonus_list) - 2) + (500 if 2 in bonus_list else 0)
+        return 0
+
+    @staticmethod
+    def level_points(level: int) -> int:
+        """
+        Дополнительные очки за установку фигуры на уровне
+
+        :param level: Уровень
+        :return: Очки
+        """
+        return level - 5 if level > 5 else 0
+
+    @staticmethod
+    def get_empty_grid() -> Grid:
+        return Rules.Grid()
+
+    @staticmethod
+    def get_lines() -> tuple[tuple[tuple[int, ...], ...], ...]:
+        """
+        Линии поля, в которых ищутся группы: вертикальные, горизонтальные и обе диагональные длиной не меньше 3
+
+        :return: Линии по направлениям, как в POINTS. Линия - индексы клеток в Grid
+        """
+        index = Rules.Grid.index
+        vertical = tuple(tuple(index(x, y) for y in range(Rules.ROWS)) for x in range(Rules.COLS))
+        horizontal = tuple(tuple(index(x, y) for x in range(Rules.COLS)) for y in range(Rules.ROWS))
+        diagonal = tuple(line for line in (
+            *(tuple(index(x, y + x) for x in range(Rules.COLS) if 0 <= y + x < Rules.ROWS)
+              for y in range(1 - Rules.COLS, Rules.ROWS)),
+            *(tuple(index(x, y - x) for x in range(Rules.COLS) if 0 <= y - x < Rules.ROWS)
+              for y in range(Rules.COLS + Rules.ROWS - 1))
+        ) if len(line) > 2)
+        return vertical, horizontal, diagonal
+
+    @staticmethod
+    def is_inside_walls(x: int, y: int) -> bool:
+        return 0 <= x < Rules.COLS and y < Rules.ROWS
+
+    def not_occupied(self, x: int, y: int) -> bool:
+        return self.grid[x, y] == 0
+
+
+Rules.LINES = Rules.get_lines()
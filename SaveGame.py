@@ -0,0 +1,106 @@
+from pathlib import Path
+from typing import Optional
+import os
+import struct
+import zlib
+
+from GameLog import GameLog
+
+
+class SaveGame:
+    """
+    Сохранение незаконченной игры и продолжение ее после перезапуска
+
+    В файл записывается снимок полного состояния Board (Board.snapshot) и сделанные до сохранения ходы
+    (GameLog.encode), чтобы продолженная игра записалась целиком, с общей контрольной суммой. Запись
+    выполняется во временный файл, который после сброса на диск атомарно заменяет сохранение, поэтому
+    при сбое питания остается либо предыдущее, либо новое сохранение целиком.
+
+    :param path: Файл сохранения
+    :param interval: Период автоматического сохранения во время игры, тики
+    """
+
+    MAGIC = b'TCS2'
+    # Сигнатура, размер снимка, размер записи ходов, контрольная сумма CRC32 снимка и ходов
+    HEADER = struct.Struct('<4sIII')
+    INTERVAL = 1000
+
+    def __init__(self, path: Path = Path('savegame.tcs'), interval: int = INTERVAL) -> None:
+        self.path = path
+        self.interval = interval
+        self.last_tick: Optional[int] = None
+
+    def save(self, board) -> None:
+        """
+        Сохранение игры. Законченная или не начатая игра не сохраняется
+
+        :param board: Игровое поле
+        """
+        if board.game_over is not False:
+            return
+        data = board.snapshot()
+        moves = GameLog.encode(board.game_log.game) if board.game_log else b''
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'wb') as file:
+            file.write(SaveGame.HEADER.pack(SaveGame.MAGIC, len(data), len(moves), zlib.crc32(moves, zlib.crc32(data))))
+            file.write(data)
+            file.write(moves)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, self.path)
+        if hasattr(os, 'O_DIRECTORY'):
+            # Переименование тоже должно попасть на диск
+            fd = os.open(self.path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self.last_tick = board.clock.ticks
+
+    def autosave(self, board) -> None:
+        """
+        Периодическое сохранение идущей игры. Вызывается из Board.drop
+
+        :param board: Игровое поле
+        """
+        if board.pause or board.game_over is not False:
+            return
+        if self.last_tick is None:
+            self.last_tick = board.clock.ticks
+        elif board.clock.ticks - self.last_tick >= self.interval:
+            self.save(board)
+
+    def load(self, board) -> bool:
+        """
+        Восстановление сохраненной игры. Игра продолжается с паузы, ее запись (Board.record) начинается заново:
+        запись ходов - с сохраненных ходов, повтор - со снимка восстановленного состояния
+
+        :param board: Игровое поле
+        :return: False, если сохранения нет или оно повреждено
+        """
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return False
+        if len(data) < SaveGame.HEADER.size:
+            return False
+        magic, size, moves_size, crc = SaveGame.HEADER.unpack_from(data)
+        body = memoryview(data)[SaveGame.HEADER.size:]
+        if magic != SaveGame.MAGIC or size != board.SNAPSHOT.size or len(body) != size + moves_size or \
+                zlib.crc32(body) != crc:
+            return False
+        board.restore(body[:size])
+        board.record(resumed=True)
+        if board.game_log and moves_size:
+            board.game_log.game = GameLog.decode(body[size:])
+        # Постановка на паузу сохраняет игру, поэтому выполняется после восстановления записи ходов
+        board.pause = True
+        self.last_tick = board.clock.ticks
+        return True
+
+    def clear(self) -> None:
+        """
+        Удаление сохранения после окончания игры
+        """
+        self.path.unlink(missing_ok=True)
+        self.last_tick = None
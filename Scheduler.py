@@ -0,0 +1,226 @@
+from pygame import Surface, Rect, transform
+from pygame.font import Font
+from pygame.event import Event, post
+import pygame.constants
+
+from time import perf_counter_ns, time
+from typing import Optional
+
+from System import resource_path
+from Board import Board
+from HighScore import HighScore, NameEntry
+from Clock import Clock
+from Colors import BLACK, WHITE, YELLOW, GREEN
+
+FONT_M = resource_path(r'fonts/pt-mono.ttf')
+
+
+class Scheduler:
+    """
+    Общий цикл кадра для нескольких игровых полей в одном окне
+
+    За кадр события распределяются по всем полям, для каждого поля выполняется падение фигуры, затем все
+    поля рисуются в свои области окна. Время обновления и отрисовки каждого поля накапливается для отчета.
+
+    Имя для нового рекорда вводится поверх поля, закончившего игру, без остановки остальных полей. Имена
+    вводятся по очереди окончания игр. Клавиши игроков, которые еще играют, действуют на их поля, остальные
+    нажатия идут в ввод имени.
+
+    Клавиша CLOSE закрывает окно, когда ни на одном поле не идет игра и имена не вводятся.
+
+    :param screen: Поверхность окна
+    :param boards: Игровые поля
+    :param clock: Общие часы игры полей
+    :param scale: Масштаб вывода полей в окне
+    :param high_score: Рекорды. Если не заданы, то рекорды не записываются
+    """
+
+    GAP = 10
+    CLOSE = pygame.K_ESCAPE
+
+    def __init__(self, screen: Surface, boards: list[Board], clock: Clock, scale: float = 1.0,
+                 high_score: Optional[HighScore] = None) -> None:
+        self.screen = screen
+        self.boards = boards
+        self.clock = clock
+        self.high_score = high_score
+        self.font = Font(FONT_M, 24)
+
+        width, height = boards[0].ctx.get_size()
+        self.size = (int(width * scale), int(height * scale))
+        self.rects = [Rect(i * (self.size[0] + Scheduler.GAP), 0, *self.size) for i in range(len(boards))]
+
+        # Состояние полей на момент последней отрисовки
+        self.states: list[tuple] = [()] * len(boards)
+
+        # Кэш надписей со счетом: {Номер поля -> ((Счет, Уровень, Остановлено), Поверхность)}
+        self.labels: dict[int, tuple[tuple[int, int, bool], Surface]] = {}
+
+        # Ввод имен для рекордов в порядке окончания игр: {Номер поля -> Ввод имени}
+        self.entries: dict[int, NameEntry] = {}
+        self.finished = [bool(board.game_over) for board in boards]
+
+        self.frames = 0
+        self.update_time = [0] * len(boards)
+        self.paint_time = [0] * len(boards)
+
+    @staticmethod
+    def window_size(boards: int, scale: float = 1.0) -> tuple[int, int]:
+        """
+        Размер окна для заданного количества полей
+
+        :param boards: Количество полей
+        :param scale: Масштаб вывода полей
+        :return: Ширина и высота окна
+        """
+        width = int(Board.BLOCK_SIZE * Board.COLS * scale)
+        height = int(Board.BLOCK_SIZE * Board.ROWS * scale)
+        return boards * width + (boards - 1) * Scheduler.GAP, height
+
+    def update(self, events: list[Event], ticks: int) -> None:
+        """
+        Обработка событий и падение фигур на всех полях
+
+        :param events: Список событий
+        :param ticks: Количество тиков часов игры, прошедших с предыдущего кадра
+        """
+        update_time = self.update_time
+        if self.entries:
+            events = self.enter_names(events)
+        if any(event.type == pygame.KEYDOWN and event.key == Scheduler.CLOSE for event in events) and \
+                not self.entries and all(board.game_over is not False for board in self.boards):
+            post(Event(pygame.QUIT))
+        for i, board in enumerate(self.boards):
+            start = perf_counter_ns()
+            board.update(events)
+            update_time[i] += perf_counter_ns() - start
+        for _ in range(ticks):
+            self.clock.tick()
+            for i, board in enumerate(self.boards):
+                start = perf_counter_ns()
+                board.drop()
+                update_time[i] += perf_counter_ns() - start
+        for i, board in enumerate(self.boards):
+            finished = bool(board.game_over)
+            if finished and not self.finished[i] and self.high_score and self.high_score.qualifies(board.score):
+                self.entries[i] = NameEntry(board.score)
+            self.finished[i] = finished
+        self.frames += 1
+
+    def enter_names(self, events: list[Event]) -> list[Event]:
+        """
+        Передача нажатий клавиш в ввод имени первого по очереди рекорда
+
+        :param events: Список событий
+        :return: События для полей: нажатия клавиш, не ушедшие в ввод имени, и остальные события
+        """
+        rest = []
+        for event in events:
+            if self.entries and event.type == pygame.KEYDOWN:
+                i, entry = next(iter(self.entries.items()))
+                # Общие клавиши полей (Enter, S) есть и у поля с рекордом, поэтому уходят в ввод имени
+                if event.key not in self.boards[i].keys and \
+                        any(board.game_over is False and event.key in board.keys for board in self.boards):
+                    rest.append(event)
+                elif entry.key(event):
+                    self.high_score.submit(entry.score, entry.text)
+                    del self.entries[i]
+                    self.states[i] = ()
+            else:
+                rest.append(event)
+        return rest
+
+    @staticmethod
+    def state(board: Board) -> tuple:
+        """
+        Значения, от которых зависит изображение поля. Поле меняется только при перемещении или повороте фигуры,
+        установке фигуры и удалении линий, а при этом меняется хотя бы одно из значений
+
+        :param board: Игровое поле
+        :return: Кортеж значений
+        """
+        piece = board.piece
+        return (id(piece), piece.x, piece.y, id(piece.shape), board.opacity, board.score, board.level,
+                board.game_over, board.pause)
+
+    def paint(self) -> None:
+        """
+        Отрисовка в окне полей, изображение которых изменилось
+        """
+        for i, board in enumerate(self.boards):
+            start = perf_counter_ns()
+            state = Scheduler.state(board)
+            if entry := self.entries.get(i):
+                state += (entry.text, self.cursor(i))
+            if state == self.states[i]:
+                continue
+            self.states[i] = state
+            board.draw()
+            board.ctx.blit(self.label(i, board), (Board.BORDER_WIDTH * 4, Board.BORDER_WIDTH * 2))
+            if entry:
+                self.draw_entry(board.ctx, entry, self.cursor(i))
+            if self.size == board.ctx.get_size():
+                self.screen.blit(board.ctx, self.rects[i])
+            else:
+                transform.scale(board.ctx, self.size, self.screen.subsurface(self.rects[i]))
+            self.paint_time[i] += perf_counter_ns() - start
+
+    def cursor(self, i: int) -> bool:
+        """
+        Видимость мигающего курсора ввода имени. Курсор есть только у ввода, который получает нажатия клавиш
+
+        :param i: Номер поля
+        :return: True, если курсор виден
+        """
+        return next(iter(self.entries)) == i and time() % 1 > 0.5
+
+    def draw_entry(self, ctx: Surface, entry: NameEntry, cursor: bool) -> None:
+        """
+        Рисует ввод имени для рекорда посередине поля
+
+        :param ctx: Поверхность поля
+        :param entry: Ввод имени
+        :param cursor: Курсор виден
+        """
+        lines = [self.font.render(f'High score {entry.score}', True, YELLOW),
+                 self.font.render(f"Name: {entry.text}{'_' if cursor else ' '}", True, WHITE)]
+        width = max(e.get_width() for e in lines) + Board.BORDER_WIDTH * 8
+        height = sum(e.get_height() for e in lines) + Board.BORDER_WIDTH * 8
+        rect = Rect(0, 0, width, height)
+        rect.center = ctx.get_rect().center
+        ctx.fill(BLACK, rect)
+        top = rect.top + Board.BORDER_WIDTH * 4
+        for line in lines:
+            ctx.blit(line, (rect.left + Board.BORDER_WIDTH * 4, top))
+            top += line.get_height()
+
+    def label(self, i: int, board: Board) -> Surface:
+        """
+        Надпись со счетом и уровнем поля. Формируется заново только при изменении значений
+
+        :param i: Номер поля
+        :param board: Игровое поле
+        :return: Поверхность с надписью
+        """
+        key = (board.score, board.level, bool(board.game_over or board.pause))
+        if i not in self.labels or self.labels[i][0] != key:
+            color = GREEN if key[2] else YELLOW
+            text = self.font.render(f'{i + 1}: {board.score}  L{board.level + 1}', True, color)
+            self.labels[i] = (key, text)
+        return self.labels[i][1]
+
+    def report(self) -> str:
+        """
+        Среднее время обновления и отрисовки полей с последнего отчета. Счетчики сбрасываются
+
+        :return: Строка отчета
+        """
+        frames = max(self.frames, 1)
+        update = sum(self.update_time) / frames / 1000
+        paint = sum(self.paint_time) / frames / 1000
+        per_board = ' '.join(f'{u / frames / 1000:.0f}/{p / frames / 1000:.0f}'
+                             for u, p in zip(self.update_time, self.paint_time))
+        self.frames = 0
+        self.update_time = [0] * len(self.boards)
+        self.paint_time = [0] * len(self.boards)
+        return f'update {update:.0f} us, paint {paint:.0f} us per frame; per board update/paint, us: {per_board}'
@@ -1,9 +1,9 @@
 from pygame.font import Font, SysFont
-from datetime import datetime
 
 from System import resource_path
 from DrawObject import DrawObject
 from Board import Board
+from Clock import Clock
 from Colors import BLACK, WHITE, BLUE, GREEN, YELLOW, RED
 
 FONT = r'Times New Roman'
@@ -15,6 +15,9 @@ class Score(DrawObject):
     Текущая информация об игре
     """
 
+    BLINK_TICKS = Clock.ms(150)
+    BLINKS = 6
+
     def __init__(self, ctx, left_top, board: Board) -> None:
         """
 
@@ -81,25 +84,45 @@ class Score(DrawObject):
         bottom_offset -= self.level_sf.get_height() * 1.5
         self.ctx.blit(self.level_sf, ((width - self.level_sf.get_width()) // 2, bottom_offset))
 
+        self.draw_bonus(bottom_offset)
+
+    def draw_bonus(self, bottom_offset: float) -> None:
+        """
+        Мигающий бонус за удаления подряд. Бонус забирается у Board и мигает BLINKS раз по часам игры
+
+        :param bottom_offset: Верхняя граница надписи уровня
+        """
         if self.board.bonus > 0 and self.bonus == 0:
             self.bonus = self.board.bonus
-            self.bonus_time = datetime.now()
+            self.board.bonus = 0
+            self.bonus_time = self.board.clock.ticks
             self.bonus_cnt = 0
 
         if self.bonus > 0:
-            d = (datetime.now() - self.bonus_time)
-            if d.microseconds > self.bonus_cnt * 150000:
+            if self.board.clock.ticks - self.bonus_time > self.bonus_cnt * Score.BLINK_TICKS:
                 self.bonus_cnt += 1
 
-                if self.bonus_cnt > 6:
+                if self.bonus_cnt > Score.BLINKS:
                     self.bonus = 0
                     return
 
-            # Bonus
-            text_surface = self.font_medium.render(str(self.bonus), True, YELLOW)
-            bottom_offset -= self.level_sf.get_height() * 1.5
-            if self.bonus_cnt % 2 != 0:
-                self.ctx.blit(text_surface, ((width - text_surface.get_width()) // 2, bottom_offset))
+            self.show_bonus(bottom_offset, self.bonus, self.bonus_cnt % 2 != 0)
+
+    def show_bonus(self, bottom_offset: float, bonus: int, visible: bool) -> None:
+        """
+        Рисует бонус над уровнем
+
+        :param bottom_offset: Верхняя граница надписи уровня
+        :param bonus: Бонус
+        :param visible: Показывать бонус: бонус мигает вместе с заголовком
+        """
+        width = self.ctx.get_width()
+
+        # Bonus
+        text_surface = self.font_medium.render(str(bonus), True, YELLOW)
+        bottom_offset -= self.level_sf.get_height() * 1.5
+        if visible:
+            self.ctx.blit(text_surface, ((width - text_surface.get_width()) // 2, bottom_offset))
 
             # Bonus title
             bottom_offset -= self.bonus_sf.get_height() * 1.5
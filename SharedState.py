@@ -0,0 +1,184 @@
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterator, Optional
+import struct
+import time
+
+from Rules import Rules
+
+
+@dataclass
+class LiveState:
+    """
+    Состояние игры, прочитанное из общей памяти
+    """
+    frame: int
+    colors: bytes
+    selected: bytes
+    piece: tuple[int, int, list[list[int]]]
+    next: list[list[int]]
+    score: int
+    level: int
+    opacity: int
+    pause: bool
+    game_over: Optional[bool]
+
+
+class SharedState:
+    """
+    Публикация состояния игры в общей памяти для внешних процессов (боты, оверлеи трансляций, тесты)
+    и прием действий от них
+
+    Блок памяти: заголовок, счетчики (версия, кадр, начало и конец очереди действий), состояние игры,
+    кольцевой буфер действий. Состояние защищено версией по схеме seqlock: перед записью версия становится
+    нечетной, после записи - снова четной. Читатель копирует состояние и повторяет чтение, если версия
+    была нечетной или изменилась. Очередь действий рассчитана на одного писателя и одного читателя (игру):
+    писатель меняет только конец очереди, читатель - только начало, поэтому блокировки не нужны.
+
+    :param name: Имя блока общей памяти. Если не задано, то выбирается системой
+    :param create: Создать блок (игра) или подключиться к существующему (внешний процесс)
+    :param capacity: Размер очереди действий
+    """
+
+    MAGIC = b'TCL1'
+    CAPACITY = 256
+    MAX_RETRIES = 1000
+    # Сигнатура, размер очереди
+    HEADER = struct.Struct('<4sI')
+    # Версия, кадр, начало очереди, конец очереди
+    SEQ, FRAME, HEAD, TAIL = range(4)
+    COUNTERS_OFFSET = HEADER.size
+    STATE_OFFSET = COUNTERS_OFFSET + 4 * 8
+    # Фигура: x, y, строк, колонок, цвета
+    PIECE_FORMAT = 'bbBB9s'
+    # Поле (цвета, отметки), фигура, следующая фигура, счет, уровень, прозрачность, пауза, конец игры
+    STATE = struct.Struct(f'<{Rules.COLS * Rules.ROWS}s{Rules.COLS * Rules.ROWS}s{PIECE_FORMAT}{PIECE_FORMAT}'
+                          f'IHbBB')
+    KEYS_OFFSET = (STATE_OFFSET + STATE.size + 7) // 8 * 8
+
+    def __init__(self, name: Optional[str] = None, create: bool = True, capacity: int = CAPACITY) -> None:
+        self.owner = create
+        if create:
+            self.shm = SharedMemory(name, create=True, size=SharedState.KEYS_OFFSET + 4 * capacity)
+            SharedState.HEADER.pack_into(self.shm.buf, 0, SharedState.MAGIC, capacity)
+        else:
+            self.shm = SharedMemory(name)
+            # Блок принадлежит игре: подключившийся процесс не должен удалять его при завершении
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+        magic, self.capacity = SharedState.HEADER.unpack_from(self.shm.buf)
+        if magic != SharedState.MAGIC:
+            self.shm.close()
+            raise ValueError('Unknown shared state format')
+        self.name = self.shm.name
+        self.counters = self.shm.buf[SharedState.COUNTERS_OFFSET:SharedState.STATE_OFFSET].cast('Q')
+        self.keys = self.shm.buf[SharedState.KEYS_OFFSET:SharedState.KEYS_OFFSET + 4 * self.capacity].cast('I')
+
+    def publish(self, board) -> None:
+        """
+        Запись состояния игры
+
+        :param board: Игровое поле
+        """
+        def piece(p) -> tuple:
+            return (p.x, p.y, len(p.shape), len(p.shape[0]), bytes(value for row in p.shape for value in row))
+
+        game_over = 2 if board.game_over is None else int(board.game_over)
+        data = SharedState.STATE.pack(board.colors(), board.selection(), *piece(board.piece), *piece(board.next),
+                                      board.score, board.level, board.opacity, board.pause, game_over)
+        counters = self.counters
+        counters[SharedState.SEQ] += 1
+        self.shm.buf[SharedState.STATE_OFFSET:SharedState.STATE_OFFSET + len(data)] = data
+        counters[SharedState.FRAME] += 1
+        counters[SharedState.SEQ] += 1
+
+    def read(self) -> Optional[LiveState]:
+        """
+        Чтение согласованного состояния игры
+
+        :return: Состояние или None, если игра еще ничего не опубликовала либо не удалось прочитать
+        состояние за MAX_RETRIES попыток
+        """
+        counters = self.counters
+        for _ in range(SharedState.MAX_RETRIES):
+            seq = counters[SharedState.SEQ]
+            if seq & 1:
+                continue
+            frame = counters[SharedState.FRAME]
+            data = bytes(self.shm.buf[SharedState.STATE_OFFSET:SharedState.STATE_OFFSET + SharedState.STATE.size])
+            if counters[SharedState.SEQ] != seq:
+                continue
+            if not frame:
+                return None
+            values = SharedState.STATE.unpack(data)
+
+            def shape(offset: int) -> list[list[int]]:
+                rows, cols, cells = values[offset:offset + 3]
+                return [list(cells[i * cols:(i + 1) * cols]) for i in range(rows)]
+
+            score, level, opacity, pause, game_over = values[12:]
+            return LiveState(frame, values[0], values[1], (values[2], values[3], shape(4)), shape(9),
+                             score, level, opacity, bool(pause), None if game_over == 2 else bool(game_over))
+        return None
+
+    def send(self, key: int) -> bool:
+        """
+        Постановка действия в очередь. Вызывается внешним процессом
+
+        :param key: Действие, значение KEY
+        :return: False, если очередь заполнена
+        """
+        counters = self.counters
+        tail = counters[SharedState.TAIL]
+        if tail - counters[SharedState.HEAD] >= self.capacity:
+            return False
+        self.keys[tail % self.capacity] = key
+        counters[SharedState.TAIL] = tail + 1
+        return True
+
+    def actions(self) -> Iterator[int]:
+        """
+        Извлечение действий из очереди. Вызывается игрой
+
+        :return: Генератор действий
+        """
+        counters = self.counters
+        head, tail = counters[SharedState.HEAD], counters[SharedState.TAIL]
+        while head != tail:
+            yield self.keys[head % self.capacity]
+            head += 1
+            counters[SharedState.HEAD] = head
+
+    def close(self) -> None:
+        self.counters.release()
+        self.keys.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def main():
+    parser = ArgumentParser(description='Вывод состояния игры TETCOLOR из общей памяти')
+    parser.add_argument('name', help='Имя блока общей памяти')
+    args = parser.parse_args()
+
+    shared = SharedState(args.name, create=False)
+    frame = 0
+    try:
+        while True:
+            state = shared.read()
+            if state and state.frame != frame:
+                frame = state.frame
+                x, y, _ = state.piece
+                print(f'frame {state.frame} score {state.score} level {state.level + 1} piece ({x},{y})'
+                      f"{' pause' if state.pause else ''}{' game over' if state.game_over else ''}")
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shared.close()
+
+
+if __name__ == '__main__':
+    main()
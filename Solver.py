@@ -0,0 +1,355 @@
+from argparse import ArgumentParser
+from collections import Counter
+from dataclasses import dataclass
+from multiprocessing import Pool, Queue, Value
+from pathlib import Path
+from queue import Empty
+from threading import Thread, Event
+from typing import Iterator, Optional
+import os
+import sys
+import time
+
+from GameLog import GameLog
+from Rules import Rules
+
+
+@dataclass(frozen=True)
+class Placement:
+    x: int
+    y: int
+    shape: tuple[tuple[int, ...], ...]
+
+
+# Максимальные очки за одну удаленную клетку: клетка может одновременно входить в вертикальную, горизонтальную
+# и две диагональные линии, и за каждую получает не больше, чем за клетку самой выгодной линии этого направления
+MAX_CELL_POINTS = sum(max(points / line_len for line_len, points in Rules.POINTS[direction].items())
+                      for direction in (0, 1, 2, 2))
+
+
+def rotations(shape: tuple[tuple[int, ...], ...]) -> list[tuple[tuple[int, ...], ...]]:
+    """
+    Различные повороты фигуры по часовой стрелке, как в Piece.rotate
+
+    :param shape: Фигура
+    :return: Список поворотов
+    """
+    result = []
+    for _ in range(4):
+        if shape not in result:
+            result.append(shape)
+        shape = tuple(row[::-1] for row in zip(*shape))
+    return result
+
+
+def placements(rules: Rules, shape: tuple[tuple[int, ...], ...]) -> Iterator[Placement]:
+    """
+    Все положения, в которых фигура может остановиться после сброса с верхней строки поля
+
+    Считается, что любую колонку и поворот можно выбрать до начала падения фигуры.
+
+    :param rules: Игровое поле
+    :param shape: Фигура
+    :return: Генератор положений
+    """
+    for rotation in rotations(shape):
+        for x in range(1 - len(rotation[0]), Rules.COLS):
+            p = Placement(x, 0, rotation)
+            if not rules.valid(p):
+                continue
+            while rules.valid(q := Placement(x, p.y + 1, rotation)):
+                p = q
+            yield p
+
+
+def play(rules: Rules, placement: Placement, level: int) -> tuple[Rules, bool]:
+    """
+    Установка фигуры по правилам игры
+
+    :param rules: Игровое поле
+    :param placement: Положение фигуры
+    :param level: Уровень
+    :return: Новое игровое поле и признак окончания игры
+    """
+    rules = rules.copy()
+    rules.freeze(placement)
+    rules.score += rules.level_points(level)
+    rules.settle()
+    return rules, placement.y == 0
+
+
+class Solver:
+    """
+    Поиск порядка установки фигур с максимальным счетом методом ветвей и границ
+
+    Ветвь отсекается, если даже оценка сверху (все клетки поля и оставшихся фигур удаляются с максимальными
+    очками и бонусами) не превышает лучший найденный счет. Результаты полностью просмотренных позиций
+    сохраняются в таблице транспозиций.
+
+    :param pieces: Последовательность фигур
+    :param level: Уровень
+    :param best: Общий для процессов лучший найденный счет
+    :param nodes: Общий для процессов счетчик просмотренных позиций
+    :param lines: Очередь для передачи улучшений лучшего счета вместе с ходами. Если не задана, то не используется
+    """
+
+    NODES_FLUSH = 1024
+
+    def __init__(self, pieces: list[tuple[tuple[int, ...], ...]], level: int = 0,
+                 best: Optional[Value] = None, nodes: Optional[Value] = None,
+                 lines: Optional[Queue] = None) -> None:
+        self.pieces = pieces
+        self.level = level
+        self.best = best if best is not None else Value('q', -1)
+        self.nodes = nodes if nodes is not None else Value('q', 0)
+        self.local_nodes = 0
+        self.lines = lines
+        # Ходы от начальной позиции до просматриваемой: ходы задания и текущий путь поиска
+        self.prefix: tuple[Placement, ...] = ()
+        self.path: list[Placement] = []
+        # Таблица транспозиций: {(Цвета поля, Номер фигуры) -> (Прирост счета, Ходы)}
+        self.table: dict[tuple[bytes, int], tuple[int, tuple[Placement, ...]]] = {}
+        # Количество клеток каждого цвета в оставшихся фигурах, начиная с каждой фигуры последовательности
+        self.cells = [Counter(value for piece in pieces[i:] for row in piece for value in row if value)
+                      for i in range(len(pieces) + 1)]
+
+    def bound(self, rules: Rules, index: int) -> int:
+        """
+        Оценка сверху прироста счета до конца последовательности
+
+        :param rules: Игровое поле
+        :param index: Номер следующей фигуры
+        :return: Максимально возможный прирост счета
+        """
+        colors = rules.colors()
+        # Удалить можно только клетки цвета, которого на поле и в фигурах не меньше трех
+        cells = sum(n for color in set(colors).union(self.cells[index])
+                    if color and (n := self.cells[index][color] + colors.count(color)) > 2)
+        remaining = len(self.pieces) - index
+        cascades = cells // 3
+        return int(cells * MAX_CELL_POINTS) + 1000 * (cascades + remaining) + \
+            rules.level_points(self.level) * remaining
+
+    def count(self) -> None:
+        self.local_nodes += 1
+        if self.local_nodes >= Solver.NODES_FLUSH:
+            with self.nodes.get_lock():
+                self.nodes.value += self.local_nodes
+            self.local_nodes = 0
+
+    def improve(self, score: int, tail: tuple[Placement, ...] = ()) -> None:
+        """
+        Обновление лучшего счета
+
+        :param score: Итоговый счет
+        :param tail: Ходы после текущего пути поиска, которые привели к счету
+        """
+        with self.best.get_lock():
+            if score <= self.best.value:
+                return
+            self.best.value = score
+        if self.lines is not None:
+            self.lines.put((score, self.prefix + tuple(self.path) + tail))
+
+    def search(self, rules: Rules, index: int) -> tuple[int, tuple[Placement, ...], bool]:
+        """
+        Поиск лучшего продолжения
+
+        :param rules: Игровое поле
+        :param index: Номер следующей фигуры
+        :return: Прирост счета, ходы и признак того, что позиция просмотрена полностью
+        """
+        self.count()
+        if index == len(self.pieces):
+            self.improve(rules.score)
+            return 0, (), True
+
+        key = (rules.colors(), index)
+        if key in self.table:
+            gain, line = self.table[key]
+            self.improve(rules.score + gain, line)
+            return gain, line, True
+
+        children = [(placement, *play(rules, placement, self.level))
+                    for placement in placements(rules, self.pieces[index])]
+        if not children:
+            self.improve(rules.score)
+            return 0, (), True
+        # Сначала самые выгодные ходы, чтобы раньше получить хорошую нижнюю границу
+        children.sort(key=lambda e: e[1].score, reverse=True)
+
+        best_gain, best_line, exact = -1, (), True
+        for placement, child, game_over in children:
+            if game_over:
+                gain, line, child_exact = 0, (), True
+                self.improve(child.score, (placement,))
+            elif child.score + self.bound(child, index + 1) <= self.best.value:
+                exact = False
+                continue
+            else:
+                self.path.append(placement)
+                gain, line, child_exact = self.search(child, index + 1)
+                self.path.pop()
+            exact = exact and child_exact
+            gain += child.score - rules.score
+            if gain > best_gain:
+                best_gain, best_line = gain, (placement, *line)
+
+        if best_gain < 0:
+            return 0, (), False
+        if exact:
+            self.table[key] = (best_gain, best_line)
+        return best_gain, best_line, exact
+
+
+solver: Optional[Solver] = None
+
+
+def init_worker(pieces: list, level: int, best: Value, nodes: Value, lines: Queue) -> None:
+    global solver
+    solver = Solver(pieces, level, best, nodes, lines)
+
+
+def solve_task(task: tuple[bytes, int, int, tuple[Placement, ...]]) -> tuple[int, tuple[Placement, ...]]:
+    """
+    Поиск в поддереве в процессе пула
+
+    :param task: Цвета поля, счет, номер следующей фигуры и ходы, которые привели к позиции
+    :return: Итоговый счет и полная последовательность ходов
+    """
+    colors, score, index, prefix = task
+    rules = Rules.from_colors(colors, score)
+    solver.prefix = prefix
+    gain, line, _ = solver.search(rules, index)
+    with solver.nodes.get_lock():
+        solver.nodes.value += solver.local_nodes
+    solver.local_nodes = 0
+    return score + gain, prefix + line
+
+
+def tasks(rules: Rules, pieces: list, level: int, depth: int) -> Iterator[tuple[bytes, int, int, tuple]]:
+    """
+    Разбиение дерева поиска на задания: все позиции после первых depth фигур
+
+    :param rules: Начальное игровое поле
+    :param pieces: Последовательность фигур
+    :param level: Уровень
+    :param depth: Глубина разбиения
+    :return: Генератор заданий
+    """
+    stack = [(rules, 0, ())]
+    while stack:
+        rules, index, prefix = stack.pop()
+        if index >= depth or index == len(pieces):
+            yield rules.colors(), rules.score, index, prefix
+            continue
+        for placement in placements(rules, pieces[index]):
+            child, game_over = play(rules, placement, level)
+            if game_over:
+                yield child.colors(), child.score, len(pieces), prefix + (placement,)
+            else:
+                stack.append((child, index + 1, prefix + (placement,)))
+
+
+def load(path: Path) -> tuple[Rules, list[tuple[tuple[int, ...], ...]]]:
+    """
+    Загрузка задачи из текстового файла
+
+    Первые ROWS строк - поле сверху вниз, по COLS символов в строке: '.' или 0 - пустая клетка, 1-6 - цвет.
+    Следующие строки - фигуры в порядке появления, строки фигуры разделяются '/', например '010/020/030'.
+
+    :param path: Файл задачи
+    :return: Игровое поле и последовательность фигур
+    """
+    lines = [line.strip() for line in path.read_text(encoding='utf-8').splitlines() if line.strip()]
+    rows = [[int(c) if c.isdigit() else 0 for c in line] for line in lines[:Rules.ROWS]]
+    colors = bytes(rows[y][x] for x in range(Rules.COLS) for y in range(Rules.ROWS))
+    pieces = [tuple(tuple(int(c) for c in row) for row in line.split('/')) for line in lines[Rules.ROWS:]]
+    # Линии, которые уже есть на поле, удаляются до начала поиска и не засчитываются первому ходу
+    rules = Rules.from_colors(colors)
+    rules.settle()
+    rules.score = 0
+    return rules, pieces
+
+
+def from_game(path: Path, start: int, cnt: int) -> tuple[Rules, list[tuple[tuple[int, ...], ...]], int]:
+    """
+    Задача из записанной игры: позиция после start ходов и следующие cnt фигур
+
+    :param path: Файл записанной игры
+    :param start: Количество ходов до начальной позиции
+    :param cnt: Количество фигур
+    :return: Игровое поле, последовательность фигур и уровень
+    """
+    game = GameLog.decode(path.read_bytes())
+    rules = Rules()
+    for move in game.moves[:start]:
+        rules.freeze(move)
+        rules.score += rules.level_points(move.level)
+        rules.settle()
+    moves = game.moves[start:start + cnt]
+    pieces = [tuple(tuple(row) for row in move.shape) for move in moves]
+    return rules, pieces, moves[0].level if moves else 0
+
+
+def main():
+    parser = ArgumentParser(description='Поиск порядка установки фигур TETCOLOR с максимальным счетом')
+    parser.add_argument('path', type=Path, help='Файл задачи или записанной игры (.tcg)')
+    parser.add_argument('--start', type=int, default=0, help='Для записанной игры: номер хода начальной позиции')
+    parser.add_argument('-n', '--pieces', type=int, default=3, help='Для записанной игры: количество фигур')
+    parser.add_argument('-l', '--level', type=int, default=None, help='Уровень')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help='Количество процессов')
+    parser.add_argument('-d', '--depth', type=int, default=1, help='Глубина разбиения дерева на задания')
+    args = parser.parse_args()
+
+    if args.path.suffix == GameLog.SUFFIX:
+        rules, pieces, level = from_game(args.path, args.start, args.pieces)
+    else:
+        (rules, pieces), level = load(args.path), 0
+    if args.level is not None:
+        level = args.level
+
+    best = Value('q', -1)
+    nodes = Value('q', 0)
+    lines = Queue()
+    best_score, best_line = rules.score, ()
+    start = time.monotonic()
+
+    stop = Event()
+
+    def report():
+        # Улучшения приходят из процессов пула сразу, а не после завершения заданий
+        shown = -1
+        next_time = time.monotonic() + 1
+        while not stop.is_set():
+            try:
+                score, line = lines.get(timeout=max(next_time - time.monotonic(), 0))
+                if score > shown:
+                    shown = score
+                    print(f'\rbest {score}: ' + ' '.join(f'({p.x},{p.y})' for p in line), file=sys.stderr)
+            except Empty:
+                pass
+            if time.monotonic() >= next_time:
+                next_time += 1
+                elapsed = time.monotonic() - start
+                print(f'\r{nodes.value} nodes, {nodes.value / elapsed:.0f} nodes/s, best {best.value}',
+                      end='', file=sys.stderr)
+
+    reporter = Thread(target=report, daemon=True)
+    reporter.start()
+    with Pool(args.workers, initializer=init_worker, initargs=(pieces, level, best, nodes, lines)) as pool:
+        for score, line in pool.imap_unordered(solve_task, tasks(rules, pieces, level, args.depth)):
+            if score > best_score or not best_line:
+                best_score, best_line = score, line
+    stop.set()
+    reporter.join()
+
+    elapsed = max(time.monotonic() - start, 1e-9)
+    print(f'\r{nodes.value} nodes, {nodes.value / elapsed:.0f} nodes/s, {elapsed:.1f} s', file=sys.stderr)
+    print(f'score {best_score}')
+    for i, p in enumerate(best_line):
+        print(f"{i + 1}: x={p.x} y={p.y} shape={'/'.join(''.join(map(str, row)) for row in p.shape)}")
+
+
+if __name__ == '__main__':
+    main()
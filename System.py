@@ -1,3 +1,4 @@
+import os
 import sys
 from pathlib import Path, PurePath
 
@@ -9,3 +10,18 @@ def resource_path(relative_path):
         bundle_dir = Path(__file__).parent
 
     return PurePath(bundle_dir, relative_path)
+
+
+def prune(path: Path, suffix: str, keep: int) -> None:
+    """
+    Удаление самых старых файлов каталога сверх заданного количества. Имена файлов должны начинаться
+    с даты и времени записи, тогда порядок имен совпадает с порядком записи
+
+    :param path: Каталог
+    :param suffix: Расширение файлов
+    :param keep: Количество оставляемых файлов
+    """
+    with os.scandir(path) as entries:
+        names = sorted(entry.name for entry in entries if entry.name.endswith(suffix) and entry.is_file())
+    for name in names[:max(len(names) - keep, 0)]:
+        (path / name).unlink(missing_ok=True)
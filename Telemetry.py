@@ -0,0 +1,149 @@
+from array import array
+from pathlib import Path
+from threading import Thread, Event
+import json
+import time
+
+
+class Telemetry:
+    """
+    Сбор статистики игры
+
+    Счетчики и гистограммы хранятся в заранее выделенных массивах, поэтому методы, вызываемые из игрового
+    цикла, только увеличивают значения. Запись в файл в формате JSON lines выполняется фоновым потоком.
+
+    :param path: Файл для записи статистики
+    :param interval: Период записи, с
+    """
+
+    MAX_LINE = 7
+    MAX_CASCADE = 15
+    RING_SIZE = 256
+    INTERVAL = 10.0
+
+    # Индексы в массиве счетчиков
+    GAMES = 0
+    PIECES = 1
+    HARD_DROPS = 2
+    RESUMED = 3
+
+    def __init__(self, path: Path = Path('telemetry.jsonl'), interval: float = INTERVAL) -> None:
+        self.path = path
+        self.interval = interval
+
+        self.counters = array('Q', bytes(8 * 4))
+        # Удаленные линии: индекс direction * (MAX_LINE + 1) + длина линии
+        self.lines = array('Q', bytes(8 * 3 * (Telemetry.MAX_LINE + 1)))
+        # Глубина каскада: индекс - количество удалений подряд
+        self.cascades = array('Q', bytes(8 * (Telemetry.MAX_CASCADE + 1)))
+
+        # Кольцевой буфер времени прохождения уровней
+        self.level_ids = array('H', bytes(2 * Telemetry.RING_SIZE))
+        self.level_times = array('d', bytes(8 * Telemetry.RING_SIZE))
+        self.level_head = 0
+        self.level_tail = 0
+        # Счетчики на момент последней записи: без изменений запись не выполняется
+        self.written = self._totals()
+
+        self._stop = Event()
+        self._thread = Thread(target=self._run, name='telemetry', daemon=True)
+        self._thread.start()
+
+    def game(self) -> None:
+        """
+        Начало новой игры
+        """
+        self.counters[Telemetry.GAMES] += 1
+
+    def resume(self) -> None:
+        """
+        Продолжение сохраненной игры. Игра уже посчитана в games при ее начале
+        """
+        self.counters[Telemetry.RESUMED] += 1
+
+    def piece(self) -> None:
+        """
+        Фигура установлена на поле
+        """
+        self.counters[Telemetry.PIECES] += 1
+
+    def hard_drop(self) -> None:
+        """
+        Выполнен сброс фигуры
+        """
+        self.counters[Telemetry.HARD_DROPS] += 1
+
+    def line(self, direction: int, length: int, cnt: int) -> None:
+        """
+        Удалены линии
+
+        :param direction: Направление линии, как в Board.POINTS
+        :param length: Длина линии
+        :param cnt: Количество линий
+        """
+        self.lines[direction * (Telemetry.MAX_LINE + 1) + min(length, Telemetry.MAX_LINE)] += cnt
+
+    def cascade(self, depth: int) -> None:
+        """
+        Завершен ход с удалением линий
+
+        :param depth: Количество удалений подряд
+        """
+        self.cascades[min(depth, Telemetry.MAX_CASCADE)] += 1
+
+    def level(self, level: int, duration: float) -> None:
+        """
+        Пройден уровень. Время прохождения измеряет поле: один экземпляр может собирать статистику
+        нескольких полей
+
+        :param level: Номер пройденного уровня
+        :param duration: Время прохождения уровня по часам игры без пауз, с
+        """
+        index = self.level_head % Telemetry.RING_SIZE
+        self.level_ids[index] = level
+        self.level_times[index] = duration
+        self.level_head += 1
+
+    def flush(self) -> None:
+        """
+        Записывает текущие значения статистики в файл, если они изменились с предыдущей записи
+        """
+        head = self.level_head
+        totals = self._totals()
+        if head == self.level_tail and totals == self.written:
+            return
+        self.written = totals
+        tail = max(self.level_tail, head - Telemetry.RING_SIZE)
+        levels = [(self.level_ids[i % Telemetry.RING_SIZE], round(self.level_times[i % Telemetry.RING_SIZE], 3))
+                  for i in range(tail, head)]
+        size = Telemetry.MAX_LINE + 1
+        lines = self.lines.tolist()
+        record = {
+            'time': time.time(),
+            'games': self.counters[Telemetry.GAMES],
+            'pieces': self.counters[Telemetry.PIECES],
+            'hard_drops': self.counters[Telemetry.HARD_DROPS],
+            'resumed': self.counters[Telemetry.RESUMED],
+            'lines': [lines[i * size:(i + 1) * size] for i in range(3)],
+            'cascades': self.cascades.tolist(),
+            'levels': levels,
+            'levels_lost': tail - self.level_tail
+        }
+        self.level_tail = head
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(record) + '\n')
+
+    def close(self) -> None:
+        """
+        Останавливает фоновый поток и записывает последние значения
+        """
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+    def _totals(self) -> tuple[bytes, bytes, bytes]:
+        return self.counters.tobytes(), self.lines.tobytes(), self.cascades.tobytes()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
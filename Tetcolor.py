@@ -2,12 +2,37 @@ from pygame import display, Surface, time, key
 from pygame.event import get
 import pygame.constants
 
-from Board import Board
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Optional
+
+from Audio import Audio
+from Board import Board, player_keys, PLAYER_KEYS
 from HighScore import HighScore
 from Score import Score
+from Telemetry import Telemetry
+from GameLog import GameLog
+from Scheduler import Scheduler
+from Clock import Clock
+from Replay import Recorder
+from SharedState import SharedState
+from SaveGame import SaveGame
+from Leaderboard import Leaderboard, FileLeaderboard, HttpLeaderboard
+
+REPORT_INTERVAL = 1000
 
 
-def main():
+def main(warp: float = 1.0, share: Optional[str] = None, leaderboard: Optional[Leaderboard] = None,
+         stats: bool = True, record: bool = True):
+    """
+    Игра на одном поле
+
+    :param warp: Множитель ускорения времени игры
+    :param share: Имя блока общей памяти для внешних процессов. Если не задано, то состояние не публикуется
+    :param leaderboard: Хранилище рекордов. Если не задано, то рекорды хранятся в файле
+    :param stats: Собирать статистику игры (Telemetry)
+    :param record: Записывать игры (GameLog) и повторы (Recorder)
+    """
     width_list = (460, Board.BLOCK_SIZE * Board.COLS, 460)
     height = Board.BLOCK_SIZE * Board.ROWS
     width = sum(width_list)
@@ -16,9 +41,17 @@ def main():
     display.set_mode((width, height))
     display.set_caption("TETCOLOR")
 
-    high_score = HighScore(Surface((width_list[0], height)), (sum(width_list[:2]), 0))
+    audio = Audio()
+    telemetry = Telemetry() if stats else None
+    game_clock = Clock(warp)
+    shared = SharedState(share) if share else None
+    save_game = SaveGame()
+    high_score = HighScore(Surface((width_list[0], height)), (sum(width_list[:2]), 0), leaderboard)
     board = Board(Surface((width_list[1], height)), (sum(width_list[:1]), 0),
-                  Surface((Board.BLOCK_SIZE * 4, Board.BLOCK_SIZE * 2)), high_score)
+                  Surface((Board.BLOCK_SIZE * 4, Board.BLOCK_SIZE * 2)), high_score, audio, telemetry,
+                  GameLog() if record else None, clock=game_clock, replay=Recorder() if record else None,
+                  shared=shared, save_game=save_game)
+    save_game.load(board)
     score = Score(Surface((width_list[2], height)), (0, 0), board)
 
     draw_objects = [high_score, board, score]
@@ -34,14 +67,104 @@ def main():
                     running = False
 
         [draw_object.update(events) for draw_object in draw_objects]
-        board.drop()
+        for _ in range(game_clock.pending()):
+            game_clock.tick()
+            board.drop()
+        audio.update()
         [draw_object.paint() for draw_object in draw_objects]
 
         display.flip()
         clock.tick(100)
 
+    save_game.save(board)
+    if telemetry:
+        telemetry.close()
+    if shared:
+        shared.close()
+    pygame.quit()
+
+
+def split(players: int, warp: float = 1.0, share: Optional[str] = None,
+          leaderboard: Optional[Leaderboard] = None, stats: bool = True, record: bool = True):
+    """
+    Игра на нескольких полях в одном окне. У каждого поля свои клавиши управления из PLAYER_KEYS. Имена для
+    рекордов вводятся поверх полей (Scheduler), таблица рекордов не выводится
+
+    :param players: Количество полей
+    :param warp: Множитель ускорения времени игры
+    :param share: Префикс имен блоков общей памяти полей. Имя блока поля - префикс и номер поля через дефис
+    :param leaderboard: Хранилище рекордов. Если не задано, то рекорды хранятся в файле
+    :param stats: Собирать статистику игры (Telemetry)
+    :param record: Записывать игры (GameLog) и повторы (Recorder). Имена файлов содержат номер поля
+    """
+    pygame.init()
+    width, height = Scheduler.window_size(players)
+    scale = min(1.0, display.Info().current_w / width)
+    display.set_mode(Scheduler.window_size(players, scale))
+    display.set_caption("TETCOLOR")
+
+    audio = Audio()
+    telemetry = Telemetry() if stats else None
+    game_clock = Clock(warp)
+    shared = [SharedState(f'{share}-{i + 1}') if share else None for i in range(players)]
+    save_games = [SaveGame(Path(f'savegame-{i + 1}.tcs')) for i in range(players)]
+    high_score = HighScore(Surface((460, Board.BLOCK_SIZE * Board.ROWS)), (0, 0), leaderboard)
+    boards = [Board(Surface((Board.BLOCK_SIZE * Board.COLS, Board.BLOCK_SIZE * Board.ROWS)), (0, 0),
+                    Surface((Board.BLOCK_SIZE * 4, Board.BLOCK_SIZE * 2)), None, audio, telemetry,
+                    GameLog(name=f'{i + 1}') if record else None, player_keys(i), game_clock,
+                    Recorder(name=f'{i + 1}') if record else None, shared[i], save_games[i], close=False)
+              for i in range(players)]
+    for board, save_game in zip(boards, save_games):
+        save_game.load(board)
+    scheduler = Scheduler(display.get_surface(), boards, game_clock, scale, high_score)
+
+    clock = time.Clock()
+    key.set_repeat(400, 25)
+    report_time = time.get_ticks()
+
+    running = True
+    while running:
+        for event in (events := get()):
+            match event.type:
+                case pygame.QUIT:
+                    running = False
+
+        scheduler.update(events, game_clock.pending())
+        audio.update()
+        scheduler.paint()
+
+        display.flip()
+        clock.tick(100)
+
+        if time.get_ticks() - report_time > REPORT_INTERVAL:
+            report_time = time.get_ticks()
+            report = scheduler.report()
+            display.set_caption(f"TETCOLOR {clock.get_fps():.0f} FPS")
+            print(f"{clock.get_fps():.0f} FPS, {report}")
+
+    for board, save_game in zip(boards, save_games):
+        save_game.save(board)
+    if telemetry:
+        telemetry.close()
+    for e in shared:
+        if e:
+            e.close()
     pygame.quit()
 
 
 if __name__ == '__main__':
-    main()
+    parser = ArgumentParser(description='TETCOLOR')
+    parser.add_argument('-p', '--players', type=int, choices=range(1, len(PLAYER_KEYS) + 1), default=1,
+                        help='Количество игровых полей в одном окне')
+    parser.add_argument('-w', '--warp', type=float, default=1.0, help='Множитель ускорения времени игры')
+    parser.add_argument('-s', '--share', help='Имя блока общей памяти для публикации состояния и приема действий')
+    parser.add_argument('-l', '--leaderboard', help='Адрес сервера рекордов, например http://127.0.0.1:8765')
+    parser.add_argument('--no-stats', action='store_true', help='Не собирать статистику игры в telemetry.jsonl')
+    parser.add_argument('--no-record', action='store_true', help='Не записывать игры в games и повторы в replays')
+    args = parser.parse_args()
+    leaderboard = HttpLeaderboard(args.leaderboard) if args.leaderboard else FileLeaderboard()
+    if args.players > 1:
+        split(args.players, args.warp, args.share, leaderboard, not args.no_stats, not args.no_record)
+    else:
+        main(args.warp, args.share, leaderboard, not args.no_stats, not args.no_record)
+    leaderboard.close()
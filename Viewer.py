@@ -0,0 +1,86 @@
+from pygame import display, Surface, time
+from pygame.event import get
+import pygame.constants
+
+from argparse import ArgumentParser
+from pathlib import Path
+
+from Board import Board
+from Score import Score
+from Clock import Clock
+from Replay import Replay
+
+# Переход назад и вперед, тики
+SEEK_TICKS = Clock.ms(5000)
+WARPS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0)
+
+
+def main():
+    parser = ArgumentParser(description='Просмотр повтора игры TETCOLOR')
+    parser.add_argument('replay', type=Path, help='Файл повтора (.tcr)')
+    parser.add_argument('-t', '--tick', type=int, default=0, help='Начальный тик от начала игры')
+    args = parser.parse_args()
+
+    width_list = (460, Board.BLOCK_SIZE * Board.COLS)
+    height = Board.BLOCK_SIZE * Board.ROWS
+
+    pygame.init()
+    display.set_mode((sum(width_list), height))
+    display.set_caption("TETCOLOR")
+
+    replay = Replay(args.replay)
+    game_clock = Clock()
+    board = Board(Surface((width_list[1], height)), (width_list[0], 0),
+                  Surface((Board.BLOCK_SIZE * 4, Board.BLOCK_SIZE * 2)), None, clock=game_clock)
+    score = Score(Surface((width_list[0], height)), (0, 0), board)
+    replay.seek(board, args.tick)
+
+    clock = time.Clock()
+    warp = WARPS.index(1.0)
+    paused = False
+
+    running = True
+    while running:
+        for event in get():
+            match event.type:
+                case pygame.QUIT:
+                    running = False
+                case pygame.KEYDOWN:
+                    match event.key:
+                        case pygame.K_ESCAPE:
+                            running = False
+                        case pygame.K_SPACE:
+                            paused = not paused
+                        case pygame.K_LEFT:
+                            replay.seek(board, replay.position - SEEK_TICKS)
+                        case pygame.K_RIGHT:
+                            replay.seek(board, replay.position + SEEK_TICKS)
+                        case pygame.K_HOME:
+                            replay.seek(board, 0)
+                        case pygame.K_END:
+                            replay.seek(board, replay.length)
+                        case pygame.K_UP:
+                            warp = min(warp + 1, len(WARPS) - 1)
+                        case pygame.K_DOWN:
+                            warp = max(warp - 1, 0)
+
+        game_clock.warp = WARPS[warp]
+        pending = game_clock.pending()
+        if not paused:
+            for _ in range(pending):
+                replay.step(board)
+        board.paint()
+        score.paint()
+
+        seconds = replay.position * Clock.TICK // 1000
+        display.set_caption(f"TETCOLOR {seconds // 60}:{seconds % 60:02} x{WARPS[warp]:g}"
+                            f"{' PAUSE' if paused else ''}")
+        display.flip()
+        clock.tick(100)
+
+    replay.close()
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()